@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for snowflake.connector used by the offline benchmarks (no account needed).
+
+install() registers fake snowflake.connector, snowflake.connector.errors and
+snowflake.connector.pandas_tools modules, so the export/load scripts run unchanged against
+FakeConnection. Tables are generated on the fly (deterministic, configurable rows and
+width), results stream in Arrow chunks, every server call counts as one round trip, and
+optional latency is injected per round trip.
+"""
+import datetime
+import decimal
+import glob
+import gzip
+import random
+import re
+import sys
+import time
+import types
+import zlib
+
+# Column kinds cycled across the table width: (name prefix, Snowflake type)
+COLUMN_KINDS = [
+    ("ID", "NUMBER(38,0)"),
+    ("AMOUNT", "NUMBER(12,2)"),
+    ("RATIO", "FLOAT"),
+    ("NAME", "VARCHAR"),
+    ("CREATED_DATE", "DATE"),
+    ("UPDATED_AT", "TIMESTAMP_NTZ"),
+    ("ACTIVE", "BOOLEAN"),
+]
+# Types whose fetchmany() values the connector builds differently from its Arrow batches:
+# nanoseconds truncated to datetime/time microseconds, TZ values in their own offset, LTZ
+# values in the session time zone, BINARY as bytearray
+EDGE_COLUMN_KINDS = [
+    ("LOADED_AT", "TIMESTAMP_NTZ(9)"),
+    ("EVENT_AT", "TIMESTAMP_TZ"),
+    ("SEEN_AT", "TIMESTAMP_LTZ"),
+    ("START_TIME", "TIME"),
+    ("PAYLOAD", "BINARY"),
+]
+# cursor.description (type_code, precision, scale) per type, as in snowflake.connector.constants.FIELD_TYPES
+DESCRIPTION_TYPES = {
+    "NUMBER(38,0)": (0, 38, 0),
+    "NUMBER(12,2)": (0, 12, 2),
+    "FLOAT": (1, None, None),
+    "VARCHAR": (2, None, None),
+    "DATE": (3, None, None),
+    "TIMESTAMP_NTZ": (8, 0, 6),
+    "BOOLEAN": (13, None, None),
+    "TIMESTAMP_NTZ(9)": (8, 0, 9),
+    "TIMESTAMP_TZ": (7, 0, 9),
+    "TIMESTAMP_LTZ": (6, 0, 9),
+    "TIME": (12, 0, 9),
+    "BINARY": (11, None, None),
+}
+SESSION_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-7))
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+STATS = {"round_trips": 0}
+SETTINGS = {"latency": 0.0, "chunk_rows": 10000}
+
+
+def round_trip():
+    """Count one client/server round trip and sleep for the injected latency."""
+    STATS["round_trips"] += 1
+    if SETTINGS["latency"]:
+        time.sleep(SETTINGS["latency"])
+
+
+class ProgrammingError(Exception):
+    pass
+
+
+class NotSupportedError(Exception):
+    pass
+
+
+class FakeTable:
+    """A generated table: rows x width columns, values derived from a fixed seed."""
+
+    def __init__(self, rows, width, null_ratio=0.05, seed=42, kinds=COLUMN_KINDS):
+        self.rows = rows
+        self.width = width
+        self.null_ratio = null_ratio
+        self.seed = seed
+        self._template = None
+        self._rows = None
+        self.columns = [(f"{kinds[i % len(kinds)][0]}_{i}", kinds[i % len(kinds)][1]) for i in range(width)]
+
+    def ddl(self, name):
+        cols = ",\n".join(f"\t{col} {sf_type}" for col, sf_type in self.columns)
+        return f"create or replace TABLE {name} (\n{cols}\n);"
+
+    def _value(self, rng, sf_type, row_no):
+        if rng.random() < self.null_ratio:
+            return None
+        if sf_type == "NUMBER(38,0)":
+            return row_no
+        if sf_type == "NUMBER(12,2)":
+            return decimal.Decimal(rng.randrange(-10**8, 10**8)).scaleb(-2)
+        if sf_type == "FLOAT":
+            return rng.random() * 1000
+        if sf_type == "VARCHAR":
+            return "".join(rng.choice("abcdefghij, \"") for _ in range(rng.randrange(0, 24)))
+        if sf_type == "DATE":
+            return datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randrange(2000))
+        if sf_type == "TIMESTAMP_NTZ":
+            return datetime.datetime(2020, 1, 1) + datetime.timedelta(seconds=rng.randrange(10**8))
+        if sf_type in ("TIMESTAMP_NTZ(9)", "TIMESTAMP_LTZ"):
+            # Nanoseconds since the epoch
+            return 1577836800 * 10**9 + rng.randrange(10**17)
+        if sf_type == "TIMESTAMP_TZ":
+            return 1577836800 * 10**9 + rng.randrange(10**17), rng.choice([-480, 0, 330, 600])
+        if sf_type == "TIME":
+            return rng.randrange(86400 * 10**9)
+        if sf_type == "BINARY":
+            return bytes(rng.randrange(256) for _ in range(rng.randrange(0, 12)))
+        return rng.random() < 0.5
+
+    @staticmethod
+    def _python_value(sf_type, value):
+        """The value as the connector's fetchmany() returns it."""
+        if value is None:
+            return None
+        if sf_type == "TIMESTAMP_NTZ(9)":
+            return datetime.datetime(1970, 1, 1) + datetime.timedelta(microseconds=value // 1000)
+        if sf_type == "TIMESTAMP_LTZ":
+            return (_EPOCH + datetime.timedelta(microseconds=value // 1000)).astimezone(SESSION_TIMEZONE)
+        if sf_type == "TIMESTAMP_TZ":
+            utc = _EPOCH + datetime.timedelta(microseconds=value[0] // 1000)
+            return utc.astimezone(datetime.timezone(datetime.timedelta(minutes=value[1])))
+        if sf_type == "TIME":
+            return (datetime.datetime(1970, 1, 1) + datetime.timedelta(microseconds=value // 1000)).time()
+        if sf_type == "BINARY":
+            return bytearray(value)
+        return value
+
+    @staticmethod
+    def _arrow_array(sf_type, values, arrow_type):
+        """The column as the connector's Arrow batches hold it (TZ and LTZ in UTC)."""
+        import pyarrow as pa
+        if sf_type == "TIMESTAMP_TZ":
+            values = [v[0] if v is not None else None for v in values]
+        if sf_type in ("TIMESTAMP_NTZ(9)", "TIMESTAMP_TZ", "TIMESTAMP_LTZ", "TIME"):
+            return pa.array(values, type=pa.int64()).cast(arrow_type)
+        return pa.array(values, type=arrow_type)
+
+    def template_chunk(self):
+        """One generated chunk of SETTINGS['chunk_rows'] rows, built once and replayed by chunks()."""
+        import pyarrow as pa
+        if self._template is None or self._template.num_rows != SETTINGS["chunk_rows"]:
+            rng = random.Random(self.seed)
+            schema = self.arrow_schema()
+            types = [sf_type for _, sf_type in self.columns]
+            rows = [
+                tuple(self._value(rng, sf_type, row_no) for sf_type in types)
+                for row_no in range(SETTINGS["chunk_rows"])
+            ]
+            self._template = pa.table(
+                [
+                    self._arrow_array(sf_type, list(col), field.type)
+                    for sf_type, col, field in zip(types, zip(*rows), schema)
+                ],
+                schema=schema,
+            )
+            self._rows = [tuple(map(self._python_value, types, row)) for row in rows]
+        return self._template
+
+    def python_rows(self, chunk):
+        """fetchmany() rows of a chunk from chunks() (each is a prefix of the template)."""
+        return self._rows[:chunk.num_rows]
+
+    def description(self):
+        """cursor.description: (name, type_code, display_size, internal_size, precision, scale, is_nullable)."""
+        rows = []
+        for col, sf_type in self.columns:
+            type_code, precision, scale = DESCRIPTION_TYPES[sf_type]
+            rows.append((col, type_code, None, None, precision, scale, True))
+        return rows
+
+    def chunks(self, limit=None, part=None):
+        """Yield pyarrow Tables of up to SETTINGS['chunk_rows'] rows, like the connector's result chunks.
+
+        Generation happens once (template_chunk), so timings measure the code under test
+        rather than the data generator. part=(i, n) yields the i-th of n near-equal slices,
+        standing in for a hash partition.
+        """
+        template = self.template_chunk()
+        total = self.rows if limit is None else min(limit, self.rows)
+        if part is not None:
+            i, n = part
+            total = total * (i + 1) // n - total * i // n
+        for start in range(0, total, template.num_rows):
+            yield template.slice(0, min(template.num_rows, total - start))
+
+    def arrow_schema(self):
+        import pyarrow as pa
+        arrow_types = {
+            "NUMBER(38,0)": pa.int64(),
+            "NUMBER(12,2)": pa.decimal128(12, 2),
+            "FLOAT": pa.float64(),
+            "VARCHAR": pa.string(),
+            "DATE": pa.date32(),
+            "TIMESTAMP_NTZ": pa.timestamp("us"),
+            "BOOLEAN": pa.bool_(),
+            "TIMESTAMP_NTZ(9)": pa.timestamp("ns"),
+            "TIMESTAMP_TZ": pa.timestamp("ns", tz="UTC"),
+            "TIMESTAMP_LTZ": pa.timestamp("ns", tz="UTC"),
+            "TIME": pa.time64("ns"),
+            "BINARY": pa.binary(),
+        }
+        return pa.schema([(col, arrow_types[sf_type]) for col, sf_type in self.columns])
+
+
+_SELECT_RE = re.compile(
+    r'^SELECT \* FROM "[^"]+"\."[^"]+"\."([^"]+)"'
+    r'(?: WHERE ABS\(MOD\(HASH\([^)]*\), (\d+)\)\) = (\d+))?(?: LIMIT (\d+))?$'
+)
+_FINGERPRINT_RE = re.compile(r"^SELECT (\d+) AS N, COUNT\(\*\) AS ROW_COUNT, HASH_AGG\(\*\) AS HASH_AGG FROM \((.*)\)$")
+_PUT_RE = re.compile(r"^PUT 'file://([^']+)'")
+# Columns of a COPY INTO <table> result, one row per loaded file
+_COPY_COLUMNS = ["file", "status", "rows_parsed", "rows_loaded", "error_limit", "errors_seen"]
+
+
+def _file_rows(path):
+    """Data rows in a staged file: Parquet row count, or CSV lines after the header."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 1
+        self.description = None
+        self.sfqid = None
+        self._chunks = iter(())
+        self._buffer = []
+        self._table = None
+
+    def execute(self, sql, params=None, **kwargs):
+        round_trip()
+        self.sfqid = f"fake-{STATS['round_trips']}"
+        self._buffer = []
+        self._chunks = iter(())
+        self._table = None
+        self.description = None
+        match = _SELECT_RE.match(sql.strip())
+        if sql.startswith("SELECT 0 AS N, COUNT(*)"):
+            self.description = [(col, None, None, None, None, None, True) for col in ("N", "ROW_COUNT", "HASH_AGG")]
+            self._buffer = [self._fingerprint(branch) for branch in sql.split("\nUNION ALL\n")]
+        elif match:
+            table = self.connection.tables[match.group(1)]
+            self._table = table
+            self.description = table.description()
+            limit = int(match.group(4)) if match.group(4) else None
+            part = (int(match.group(3)), int(match.group(2))) if match.group(2) else None
+            self._chunks = table.chunks(limit, part)
+        elif sql.startswith("SELECT GET_DDL('TABLE'"):
+            name = params[0].split(".")[-1].strip('"')
+            self.description = [("GET_DDL", None, None, None, None, None, True)]
+            self._buffer = [(self.connection.tables[name].ddl(name),)]
+        elif sql.startswith("SELECT GET_DDL("):
+            raise ProgrammingError("GET_DDL not supported by the fake connector")
+        elif _PUT_RE.match(sql) and kwargs.get("file_stream") is not None:
+            import pyarrow.parquet as pq
+            rows = pq.ParquetFile(kwargs["file_stream"]).metadata.num_rows
+            self.connection.staged.append((_PUT_RE.match(sql).group(1), rows))
+        elif _PUT_RE.match(sql):
+            # Files are counted at PUT time; callers may delete them before the COPY
+            for path in sorted(glob.glob(_PUT_RE.match(sql).group(1))):
+                self.connection.staged.append((path, _file_rows(path)))
+        elif sql.startswith("COPY INTO \""):
+            self.description = [(col, None, None, None, None, None, True) for col in _COPY_COLUMNS]
+            self._buffer = [(path, "LOADED", rows, rows, 1, 0) for path, rows in self.connection.staged]
+            self.connection.staged = []
+        elif sql.startswith("REMOVE "):
+            self.connection.staged = []
+        self.connection.executed.append(sql)
+        return self
+
+    def _fingerprint(self, branch):
+        """(n, rows, hash) for one fingerprint branch; the hash stands in for HASH_AGG over the table's rows."""
+        n, inner = _FINGERPRINT_RE.match(branch).groups()
+        match = _SELECT_RE.match(inner)
+        if not match or match.group(1) not in self.connection.tables:
+            raise ProgrammingError(f"Object does not exist: {inner}")
+        table = self.connection.tables[match.group(1)]
+        limit = int(match.group(4)) if match.group(4) else None
+        part = (int(match.group(3)), int(match.group(2))) if match.group(2) else None
+        rows = sum(chunk.num_rows for chunk in table.chunks(limit, part))
+        return int(n), rows, zlib.crc32(f"{table.seed}:{table.width}:{rows}".encode())
+
+    def execute_async(self, sql, params=None):
+        """Run the query now and park its result (or error) on the connection under a new query ID."""
+        try:
+            self.execute(sql, params)
+        except ProgrammingError as e:
+            self.connection.async_results[self.sfqid] = e
+            return {"queryId": self.sfqid}
+        self.connection.async_results[self.sfqid] = (self.description, self._chunks, self._buffer, self._table)
+        self._chunks, self._buffer, self._table = iter(()), [], None
+        return {"queryId": self.sfqid}
+
+    def get_results_from_sfqid(self, sfqid):
+        round_trip()
+        self.sfqid = sfqid
+        self.description, self._chunks, self._buffer, self._table = self.connection.async_results.pop(sfqid)
+
+    def executemany(self, sql, seq_of_params):
+        round_trip()
+        self.connection.executed.append(sql)
+        self.rowcount = len(seq_of_params)
+        return self
+
+    def _next_chunk(self):
+        chunk = next(self._chunks, None)
+        if chunk is not None:
+            # The connector downloads each result chunk separately
+            round_trip()
+        return chunk
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        while len(self._buffer) < size:
+            chunk = self._next_chunk()
+            if chunk is None:
+                break
+            self._buffer.extend(self._table.python_rows(chunk))
+        rows, self._buffer = self._buffer[:size], self._buffer[size:]
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self):
+        rows = list(self._buffer)
+        self._buffer = []
+        for chunk in iter(self._next_chunk, None):
+            rows.extend(self._table.python_rows(chunk))
+        return rows
+
+    def fetch_arrow_batches(self):
+        if self._table is None:
+            raise NotSupportedError("no Arrow result")
+        return iter(self._next_chunk, None)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Connection over a dict of {table_name: FakeTable}; records executed SQL."""
+
+    def __init__(self, tables=None):
+        self.tables = tables or {}
+        self.executed = []
+        self.async_results = {}
+        self.staged = []
+        self.closed = False
+        self.arrow_number_to_decimal = True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_query_status_throw_if_error(self, sfqid):
+        round_trip()
+        result = self.async_results.get(sfqid)
+        if isinstance(result, Exception):
+            raise result
+        return "SUCCESS"
+
+    def is_still_running(self, status):
+        return status == "RUNNING"
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def write_pandas(conn, df, table_name, schema=None, database=None, **kwargs):
+    """Simulate write_pandas: serialize the chunk to Parquet in memory, then stage + COPY round trips."""
+    import io
+    df.to_parquet(io.BytesIO(), compression="snappy")
+    # CREATE TEMP STAGE, PUT, COPY INTO
+    for _ in range(3):
+        round_trip()
+    return True, 1, len(df), []
+
+
+def install():
+    """Register the fake modules as snowflake.connector (call before importing the scripts)."""
+    snowflake = types.ModuleType("snowflake")
+    connector = types.ModuleType("snowflake.connector")
+    errors = types.ModuleType("snowflake.connector.errors")
+    pandas_tools = types.ModuleType("snowflake.connector.pandas_tools")
+    errors.ProgrammingError = ProgrammingError
+    errors.NotSupportedError = NotSupportedError
+    pandas_tools.write_pandas = write_pandas
+    connector.errors = errors
+    connector.pandas_tools = pandas_tools
+    connector.ProgrammingError = ProgrammingError
+    connector.connect = lambda **kwargs: FakeConnection()
+    snowflake.connector = connector
+    sys.modules.update({
+        "snowflake": snowflake,
+        "snowflake.connector": connector,
+        "snowflake.connector.errors": errors,
+        "snowflake.connector.pandas_tools": pandas_tools,
+    })
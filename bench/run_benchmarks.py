@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmarks for the export and load paths (no Snowflake account needed).
+
+Each case runs in its own subprocess against bench/fake_snowflake.py, so peak RSS is per
+case. Reports rows/sec, MB/sec, peak RSS and server round trips, checks that the Arrow and
+python CSV writers produce identical bytes (for the benchmark table and for a table of
+TIMESTAMP_TZ/LTZ, nanosecond, TIME and BINARY columns whose fetchmany() values are built like
+the connector's), and saves the results as JSON in bench/results/.
+
+Usage:
+  python bench/run_benchmarks.py [--rows 200000] [--width 14] [--latency-ms 0] [--chunk-rows 10000]
+  python bench/run_benchmarks.py --compare bench/results/A.json bench/results/B.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+_bench_dir = Path(__file__).resolve().parent
+_repo_dir = _bench_dir.parent
+RESULTS_DIR = _bench_dir / "results"
+
+DATABASE = "BENCH_DB"
+SCHEMA = "BENCH"
+TABLE = "WIDE_TABLE"
+
+# (case, description) in run order; load_* cases read the CSV written by export_csv_python
+CASES = [
+    ("export_csv_python", "export_table_to_csv, fetchmany + per-cell str()"),
+    ("export_csv_arrow", "export_table_to_csv, Arrow batches a column at a time"),
+    ("export_parquet", "export_table_to_parquet"),
+    ("export_csv_partitioned", "export_table_partitioned, hash partitions fetched concurrently"),
+    ("load_csv_write_pandas", "load_csv_into_table via write_pandas"),
+    ("load_csv_insert", "load_csv_into_table via executemany INSERT fallback"),
+    ("load_csv_arrow", "load_csv_arrow, multithreaded Arrow parse typed from DDL, Parquet + PUT/COPY"),
+    ("run_ddl_file", "run_ddl_file, one CREATE TABLE per statement"),
+    ("plan_schema_ddl", "plan_schema_ddl, one existing-tables query and one multi-statement batch"),
+]
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, args, work_dir):
+    """Run one case in this process and return its measurements."""
+    sys.path.insert(0, str(_repo_dir))
+    sys.path.insert(0, str(_bench_dir))
+    import fake_snowflake
+    fake_snowflake.install()
+    fake_snowflake.SETTINGS["latency"] = args.latency_ms / 1000
+    fake_snowflake.SETTINGS["chunk_rows"] = args.chunk_rows
+    table = fake_snowflake.FakeTable(args.rows, args.width)
+    table.template_chunk()
+    conn = fake_snowflake.FakeConnection({TABLE: table})
+    os.environ.pop("SNOWFLAKE_EXPORT_LIMIT", None)
+
+    import export_snowflake_to_csv as export
+    import load_data_to_snowflake as load
+
+    csv_path = work_dir / "export_csv_python.csv"
+    out_path = None
+    start = time.perf_counter()
+    if case in ("export_csv_python", "export_csv_arrow"):
+        os.environ["SNOWFLAKE_EXPORT_CSV_WRITER"] = case.rsplit("_", 1)[1]
+        out_path = work_dir / f"{case}.csv"
+        rows = export.export_table_to_csv(conn, DATABASE, SCHEMA, TABLE, out_path)
+    elif case == "csv_writers_edge_types":
+        # Small table of every column kind; both writers' output is compared by main()
+        table = fake_snowflake.FakeTable(
+            2000, 2 * len(fake_snowflake.COLUMN_KINDS + fake_snowflake.EDGE_COLUMN_KINDS),
+            kinds=fake_snowflake.COLUMN_KINDS + fake_snowflake.EDGE_COLUMN_KINDS,
+        )
+        conn = fake_snowflake.FakeConnection({TABLE: table})
+        for writer in ("python", "arrow"):
+            os.environ["SNOWFLAKE_EXPORT_CSV_WRITER"] = writer
+            out_path = work_dir / f"{case}_{writer}.csv"
+            rows = export.export_table_to_csv(conn, DATABASE, SCHEMA, TABLE, out_path)
+    elif case == "export_parquet":
+        out_path = work_dir / f"{case}.parquet"
+        rows = export.export_table_to_parquet(conn, DATABASE, SCHEMA, TABLE, out_path)
+    elif case == "export_csv_partitioned":
+        out_path = work_dir / case
+        rows = export.export_table_partitioned(conn, DATABASE, SCHEMA, TABLE, out_path, args.partitions)
+    elif case == "load_csv_write_pandas":
+        out_path = csv_path
+        rows = load.load_csv_into_table(conn, DATABASE, SCHEMA, TABLE, csv_path)
+    elif case == "load_csv_insert":
+        out_path = csv_path
+        sys.modules["snowflake.connector.pandas_tools"].write_pandas = _write_pandas_unavailable
+        rows = load.load_csv_into_table(conn, DATABASE, SCHEMA, TABLE, csv_path)
+    elif case == "load_csv_arrow":
+        out_path = csv_path
+        ddl_path = work_dir / f"{TABLE}.sql"
+        ddl_path.write_text(table.ddl(TABLE), encoding="utf-8")
+        rows, _ = load.load_csv_arrow(conn, DATABASE, SCHEMA, TABLE, [csv_path], ddl_path)
+    elif case == "run_ddl_file":
+        out_path = work_dir / "bench.sql"
+        out_path.write_text(
+            "".join(
+                table.ddl(f'${{database}}.${{schema}}."T{i}"').replace("create or replace TABLE", "CREATE TABLE IF NOT EXISTS") + "\n"
+                for i in range(args.ddl_statements)
+            ),
+            encoding="utf-8",
+        )
+        fake_snowflake.STATS["round_trips"] = 0
+        start = time.perf_counter()
+        load.run_ddl_file(conn, out_path, DATABASE, SCHEMA)
+        rows = args.ddl_statements
+    elif case == "plan_schema_ddl":
+        ddl_dir = work_dir / "ddl"
+        ddl_dir.mkdir(exist_ok=True)
+        tables = []
+        for i in range(args.ddl_statements):
+            ddl_path = ddl_dir / f"T{i}.sql"
+            ddl_path.write_text(table.ddl(f"T{i}"), encoding="utf-8")
+            tables.append((f"T{i}", ddl_path))
+        out_path = ddl_dir / "T0.sql"
+        fake_snowflake.STATS["round_trips"] = 0
+        start = time.perf_counter()
+        rows = len(load.plan_schema_ddl(conn, DATABASE, SCHEMA, tables))
+    else:
+        raise SystemExit(f"Unknown case: {case}")
+    seconds = time.perf_counter() - start
+    files = list(out_path.iterdir()) if out_path.is_dir() else [out_path]
+    size_mb = sum(f.stat().st_size for f in files) / (1024 * 1024)
+    return {
+        "case": case,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "mb": round(size_mb, 3),
+        "mb_per_sec": round(size_mb / seconds, 3) if seconds else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "round_trips": fake_snowflake.STATS["round_trips"],
+    }
+
+
+def _write_pandas_unavailable(*args, **kwargs):
+    raise RuntimeError("write_pandas disabled for this benchmark case")
+
+
+def _run_subprocess(case, args, work_dir):
+    cmd = [
+        sys.executable, str(Path(__file__).resolve()), "--case", case, "--work-dir", str(work_dir),
+        "--rows", str(args.rows), "--width", str(args.width), "--latency-ms", str(args.latency_ms),
+        "--chunk-rows", str(args.chunk_rows), "--ddl-statements", str(args.ddl_statements),
+        "--partitions", str(args.partitions),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"  {case}: FAILED\n{proc.stderr}", file=sys.stderr)
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _print_result(result):
+    print(
+        f"  {result['case']:<24} {result['rows']:>10} rows  {result['seconds']:>8.3f}s  "
+        f"{result['rows_per_sec'] or 0:>12,.0f} rows/s  {result['mb_per_sec'] or 0:>8.2f} MB/s  "
+        f"{result['peak_rss_mb']:>8.1f} MB RSS  {result['round_trips']:>6} round trips"
+    )
+
+
+def compare(old_path, new_path):
+    """Print per-case rows/sec and peak RSS changes between two result files."""
+    old = {r["case"]: r for r in json.loads(Path(old_path).read_text(encoding="utf-8"))["results"]}
+    new = {r["case"]: r for r in json.loads(Path(new_path).read_text(encoding="utf-8"))["results"]}
+    for case, result in new.items():
+        base = old.get(case)
+        if not base or not base.get("rows_per_sec"):
+            print(f"  {case:<24} (no baseline)")
+            continue
+        speedup = result["rows_per_sec"] / base["rows_per_sec"]
+        print(
+            f"  {case:<24} {speedup:>6.2f}x rows/s  "
+            f"RSS {base['peak_rss_mb']:.1f} -> {result['peak_rss_mb']:.1f} MB  "
+            f"round trips {base['round_trips']} -> {result['round_trips']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline export/load benchmarks against a fake connector.")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows in the generated table")
+    parser.add_argument("--width", type=int, default=14, help="Columns in the generated table")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per round trip")
+    parser.add_argument("--chunk-rows", type=int, default=10000, help="Rows per fake result chunk")
+    parser.add_argument("--ddl-statements", type=int, default=500, help="Statements in the run_ddl_file case")
+    parser.add_argument("--partitions", type=int, default=8, help="Partitions in the export_csv_partitioned case")
+    parser.add_argument("--cases", help="Comma-separated subset of cases to run")
+    parser.add_argument("--output", help="Results JSON path (default bench/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.case:
+        print(json.dumps(run_case(args.case, args, Path(args.work_dir))))
+        return
+
+    selected = [c for c, _ in CASES]
+    if args.cases:
+        selected = [c.strip() for c in args.cases.split(",") if c.strip()]
+        unknown = set(selected) - {c for c, _ in CASES}
+        if unknown:
+            raise SystemExit(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    print(f"Benchmark: {args.rows} rows x {args.width} columns, latency {args.latency_ms} ms/round trip")
+    results = []
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        if any(c.startswith("load_csv") for c in selected) and "export_csv_python" not in selected:
+            # Load cases read the python writer's CSV; produce it without reporting it
+            if _run_subprocess("export_csv_python", args, work_dir) is None:
+                sys.exit(1)
+        for case in selected:
+            result = _run_subprocess(case, args, work_dir)
+            if result is None:
+                failed = True
+                continue
+            _print_result(result)
+            results.append(result)
+
+        identical = None
+        python_csv = work_dir / "export_csv_python.csv"
+        arrow_csv = work_dir / "export_csv_arrow.csv"
+        if python_csv.exists() and arrow_csv.exists():
+            identical = python_csv.read_bytes() == arrow_csv.read_bytes()
+            print(f"  Arrow CSV writer output {'matches' if identical else 'DIFFERS FROM'} the python writer")
+            if _run_subprocess("csv_writers_edge_types", args, work_dir) is None:
+                identical = False
+            else:
+                edge_same = (
+                    (work_dir / "csv_writers_edge_types_python.csv").read_bytes()
+                    == (work_dir / "csv_writers_edge_types_arrow.csv").read_bytes()
+                )
+                print(
+                    f"  Arrow CSV writer output {'matches' if edge_same else 'DIFFERS FROM'} the python writer "
+                    "for TZ/LTZ, nanosecond, TIME and BINARY columns"
+                )
+                identical = identical and edge_same
+            failed = failed or not identical
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "settings": {
+                    "rows": args.rows,
+                    "width": args.width,
+                    "latency_ms": args.latency_ms,
+                    "chunk_rows": args.chunk_rows,
+                    "ddl_statements": args.ddl_statements,
+                    "partitions": args.partitions,
+                },
+                "csv_writers_identical": identical,
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    print(f"Results saved to {output}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,8 @@ Test connection to Snowflake using credentials from .env.
 Run: python connect_snowflake.py
 """
 import os
-from pathlib import Path
 
-from dotenv import load_dotenv
-
-_script_dir = Path(__file__).resolve().parent
-load_dotenv(_script_dir / ".env")
-load_dotenv(_script_dir.parent / ".env")
+from snowflake_connection import connect
 
 
 def main():
@@ -20,7 +15,6 @@ def main():
     warehouse = os.getenv("SNOWFLAKE_WAREHOUSE")
     database = os.getenv("SNOWFLAKE_DATABASE")
     schema = os.getenv("SNOWFLAKE_SCHEMA")
-    role = os.getenv("SNOWFLAKE_ROLE")
 
     missing = []
     for name, val in [
@@ -38,19 +32,7 @@ def main():
         print("Copy env.example to .env and set your Snowflake credentials.")
         raise SystemExit(1)
 
-    if account and ".snowflakecomputing.com" in account:
-        account = account.replace(".snowflakecomputing.com", "")
-
-    import snowflake.connector
-    conn = snowflake.connector.connect(
-        account=account,
-        user=user,
-        password=password,
-        warehouse=warehouse,
-        role=role,
-        database=database,
-        schema=schema,
-    )
+    conn = connect(database, schema)
     cur = conn.cursor()
     cur.execute("SELECT CURRENT_USER(), CURRENT_WAREHOUSE(), CURRENT_DATABASE(), CURRENT_SCHEMA()")
     row = cur.fetchone()
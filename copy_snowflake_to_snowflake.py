@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Copy tables from a source Snowflake database straight into the target, with no data files on disk.
+
+The source connection reads SNOWFLAKE_SOURCE_ACCOUNT, _USER, _PASSWORD, _WAREHOUSE and _ROLE
+(each falls back to its SNOWFLAKE_ setting, so a copy within one account only needs
+SNOWFLAKE_SOURCE_DATABASE); the target is the usual SNOWFLAKE_* connection and SNOWFLAKE_DATABASE.
+
+Per schema, table DDL is read from the source as the export does (one GET_DDL('SCHEMA'),
+per-table GET_DDL as fallback) and applied on the target as the load does (plan_schema_ddl).
+Each table's Arrow result batches are then read on a background thread into a bounded queue
+while the target side writes them to in-memory Parquet files, PUTs them to the table stage and
+finishes with one COPY INTO, so the data makes a single pass from source to target.
+
+Run: python copy_snowflake_to_snowflake.py [--schema NAME ...]
+"""
+import argparse
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from export_snowflake_to_csv import description_schema, export_ddl, export_schema_ddl, select_sql
+from load_data_to_snowflake import (
+    copy_from_stage,
+    ensure_schema,
+    plan_schema_ddl,
+    prefetch,
+    run_ddl_file,
+    snowflake_type,
+)
+from run_metrics import RunMetrics, add, phase, query_id
+from snowflake_catalog import discover_catalog, tables_by_schema
+from snowflake_connection import ConnectionPool, connect, connection_params, int_env, require_env
+
+SOURCE_PREFIX = "SNOWFLAKE_SOURCE_"
+
+
+def _copy_workers():
+    """Number of tables copied concurrently (SNOWFLAKE_COPY_WORKERS, default 4)."""
+    return int_env("SNOWFLAKE_COPY_WORKERS", 4, minimum=1)
+
+
+def result_batches(cur):
+    """Yield the cursor's result as pyarrow Tables, converting fetchmany() rows if Arrow is not available."""
+    import pyarrow as pa
+    import snowflake.connector.errors
+    try:
+        batches = cur.fetch_arrow_batches()
+    except snowflake.connector.errors.NotSupportedError:
+        batches = None
+    if batches is not None:
+        yield from batches
+        return
+    columns = [d[0] for d in cur.description]
+    while True:
+        rows = cur.fetchmany(10000)
+        if not rows:
+            return
+        yield pa.table({name: list(values) for name, values in zip(columns, zip(*rows))})
+
+
+def load_batches(conn, database, schema, table_name, batches, create_schema=None):
+    """PUT Arrow batches to the table stage as in-memory Parquet files, then COPY INTO; returns (rows, errors, bytes)."""
+    import pyarrow.parquet as pq
+    file_bytes = int_env("SNOWFLAKE_COPY_FILE_BYTES", 64 * 1024 * 1024, minimum=1)
+    stage = f'@"{database}"."{schema}".%"{table_name}"'
+    cur = conn.cursor()
+    files = 0
+    uploaded = 0
+    sink = writer = None
+    pending = 0
+
+    def _put():
+        nonlocal files, uploaded, sink, writer, pending
+        writer.close()
+        data = sink.getvalue()
+        with phase("put"):
+            cur.execute(
+                f"PUT 'file://part_{files:05d}.parquet' {stage} AUTO_COMPRESS = FALSE OVERWRITE = TRUE",
+                file_stream=io.BytesIO(data),
+            )
+        query_id(cur)
+        files += 1
+        uploaded += len(data)
+        sink = writer = None
+        pending = 0
+
+    try:
+        if create_schema is not None:
+            cols = ", ".join(f'"{field.name}" {snowflake_type(field.type)}' for field in create_schema)
+            with phase("ddl"):
+                cur.execute(f'CREATE TABLE IF NOT EXISTS "{database}"."{schema}"."{table_name}" ({cols})')
+        cur.execute(f"REMOVE {stage}")
+        while True:
+            with phase("fetch"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            if writer is not None and not batch.schema.equals(writer.schema):
+                _put()
+            with phase("write"):
+                if writer is None:
+                    sink = io.BytesIO()
+                    writer = pq.ParquetWriter(sink, batch.schema)
+                writer.write_table(batch)
+            pending += batch.nbytes
+            if pending >= file_bytes:
+                _put()
+        if writer is not None:
+            _put()
+        if not files:
+            return 0, 0, 0
+        rows, errors = copy_from_stage(
+            cur, database, schema, table_name, stage, "TYPE = PARQUET", " MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE"
+        )
+        return rows, errors, uploaded
+    finally:
+        cur.close()
+
+
+def copy_table(source_conn, source_database, target_conn, target_database, schema, table_name, create=False):
+    """Stream one table from the source into the target; returns (rows_loaded, errors)."""
+    cur = source_conn.cursor()
+    batches = None
+    try:
+        with phase("query"):
+            cur.execute(select_sql(source_database, schema, table_name))
+        query_id(cur)
+        # Typed from the result metadata, so a table without rows is created as well
+        create_schema = description_schema(cur.description) if create else None
+        batches = prefetch(result_batches(cur), int_env("SNOWFLAKE_COPY_QUEUE_BATCHES", 4, minimum=1))
+        rows, errors, uploaded = load_batches(
+            target_conn, target_database, schema, table_name, batches, create_schema
+        )
+    finally:
+        if batches is not None:
+            batches.close()
+        cur.close()
+    add(rows=rows, bytes=uploaded)
+    return rows, errors
+
+
+def prepare_schema(source_conn, source_database, target_conn, target_database, schema, tables):
+    """Create the schema and its tables on the target from the source DDL; returns the tables without readable DDL."""
+    ensure_schema(target_conn, target_database, schema)
+    with tempfile.TemporaryDirectory(prefix="sunspectra_copy_") as tmp:
+        ddl_dir = Path(tmp)
+        written = export_schema_ddl(source_conn, source_database, schema, tables, ddl_dir)
+        for name in tables:
+            if name not in written:
+                export_ddl(source_conn, source_database, schema, name, ddl_dir)
+        with_ddl = [(name, ddl_dir / f"{name}.sql") for name in tables if (ddl_dir / f"{name}.sql").exists()]
+        ready = plan_schema_ddl(target_conn, target_database, schema, with_ddl)
+        for name, ddl_path in with_ddl:
+            if name not in ready:
+                run_ddl_file(target_conn, ddl_path, target_database, schema)
+    return set(tables) - {name for name, _ in with_ddl}
+
+
+def copy_schemas(source_conn, source_database, target_conn, target_database, schema_tables, workers=None):
+    """Copy {schema: [table, ...]} from source to target; returns (copied, failures)."""
+    workers = workers or _copy_workers()
+    metrics = RunMetrics("copy", sum(len(tables) for tables in schema_tables.values()))
+    copied = 0
+    failures = []
+
+    def _copy_measured(source, target, schema, table_name, create):
+        with metrics.item(f"{schema}.{table_name}"):
+            return copy_table(source, source_database, target, target_database, schema, table_name, create)
+
+    def _report(label, copy):
+        nonlocal copied
+        try:
+            n, errors = copy()
+        except Exception as e:
+            failures.append((label, e))
+            metrics.report(f"  {label}: FAILED ({e})")
+            return
+        copied += 1
+        metrics.report(f"  {label}: {n} rows copied" + (f" ({errors} errors)" if errors else ""))
+
+    if workers <= 1:
+        for schema, tables in schema_tables.items():
+            without_ddl = prepare_schema(source_conn, source_database, target_conn, target_database, schema, tables)
+            for name in tables:
+                _report(
+                    f"{schema}.{name}",
+                    lambda: _copy_measured(source_conn, target_conn, schema, name, name in without_ddl),
+                )
+        metrics.summary()
+        return copied, failures
+
+    source_pool = ConnectionPool(lambda: connect(source_database, prefix=SOURCE_PREFIX), workers)
+    target_pool = ConnectionPool(lambda: connect(target_database), workers)
+
+    def _copy_one(schema, table_name, create):
+        with source_pool.connection() as source, target_pool.connection() as target:
+            return _copy_measured(source, target, schema, table_name, create)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = []
+    try:
+        for schema, tables in schema_tables.items():
+            without_ddl = prepare_schema(source_conn, source_database, target_conn, target_database, schema, tables)
+            for name in tables:
+                futures.append((f"{schema}.{name}", executor.submit(_copy_one, schema, name, name in without_ddl)))
+        for label, future in futures:
+            _report(label, future.result)
+    finally:
+        for _, future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        source_pool.close_all()
+        target_pool.close_all()
+    metrics.summary()
+    return copied, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Copy tables from SNOWFLAKE_SOURCE_DATABASE into SNOWFLAKE_DATABASE without local files."
+    )
+    parser.add_argument(
+        "--schema", action="append", dest="schemas", metavar="NAME",
+        help="Copy only this schema (repeat for several; default: all schemas in the source database).",
+    )
+    args = parser.parse_args()
+
+    (source_database,) = require_env("SNOWFLAKE_SOURCE_DATABASE")
+    (target_database,) = require_env("SNOWFLAKE_DATABASE")
+    source_account = connection_params(prefix=SOURCE_PREFIX)["account"]
+    if (source_account.lower(), source_database.upper()) == (connection_params()["account"].lower(), target_database.upper()):
+        raise SystemExit("Source and target are the same database. Set SNOWFLAKE_SOURCE_DATABASE (and account) in .env.")
+
+    source_conn = connect(source_database, prefix=SOURCE_PREFIX)
+    target_conn = connect(target_database)
+    try:
+        schema_tables = tables_by_schema(discover_catalog(source_conn, source_database, refresh=True))
+        if args.schemas:
+            unknown = set(args.schemas) - set(schema_tables)
+            if unknown:
+                raise SystemExit(f"Schemas not found in {source_database}: {', '.join(sorted(unknown))}")
+            schema_tables = {schema: schema_tables[schema] for schema in args.schemas}
+        if not schema_tables:
+            raise SystemExit(f"No tables found in {source_database}.")
+        print(f"Copying {sum(map(len, schema_tables.values()))} tables from {source_database} to {target_database}")
+        copied, failures = copy_schemas(source_conn, source_database, target_conn, target_database, schema_tables)
+    finally:
+        source_conn.close()
+        target_conn.close()
+    print(f"Done. Copied {copied} tables across {len(schema_tables)} schemas.")
+    if failures:
+        print(f"{len(failures)} table(s) failed to copy:")
+        for label, error in failures:
+            print(f"  {label}: {error}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
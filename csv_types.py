@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Infer Snowflake column types from exported CSV files.
+
+Columns are checked with vectorized pandas string operations, chunk by chunk, so whole
+files can be streamed in bounded memory. Empty fields are NULLs (the exporter writes
+NULL as ""). Inferred types: BOOLEAN, NUMBER(38,s), FLOAT, DATE, TIMESTAMP_NTZ,
+TIMESTAMP_TZ, else VARCHAR. Numbers and strings are not sized to the values seen: the DDL is
+cached and reused for later loads, whose values may be longer or wider than the sample's.
+"""
+_INT_RE = r"[+-]?\d+"
+_DECIMAL_RE = r"[+-]?(?:\d+\.\d*|\.\d+)"
+_DATE_RE = r"\d{4}-\d{2}-\d{2}"
+_TIMESTAMP_RE = r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,9})?)?"
+_TZ_RE = r"(?:Z|[+-]\d{2}:?\d{2})"
+_BOOLEANS = {"true", "false", "True", "False", "TRUE", "FALSE"}
+
+_CANDIDATES = ("boolean", "integer", "decimal", "float", "date", "timestamp_ntz", "timestamp_tz")
+
+
+def _new_state():
+    return {"candidates": set(_CANDIDATES), "int_digits": 0, "scale": 0, "seen": False}
+
+
+def _update(state, values):
+    """Narrow a column's candidate types with one chunk of non-empty string values."""
+    import pandas as pd
+    if values.empty:
+        return
+    state["seen"] = True
+    candidates = state["candidates"]
+    if "boolean" in candidates and not values.isin(_BOOLEANS).all():
+        candidates.discard("boolean")
+    if candidates & {"integer", "decimal"}:
+        is_int = values.str.fullmatch(_INT_RE)
+        # Leading zeros (ZIP codes, account numbers) would be lost as NUMBER
+        unsigned = values.str.lstrip("+-")
+        leading_zero = is_int & unsigned.str.startswith("0") & (unsigned.str.len() > 1)
+        is_decimal = values.str.fullmatch(_DECIMAL_RE)
+        if leading_zero.any():
+            candidates -= {"integer", "float"}
+        if not (is_int & ~leading_zero).all():
+            candidates.discard("integer")
+        if not ((is_int & ~leading_zero) | is_decimal).all():
+            candidates.discard("decimal")
+        if candidates & {"integer", "decimal"}:
+            parts = unsigned.str.split(".", n=1, expand=True)
+            int_digits = parts[0].str.lstrip("0").str.len()
+            state["int_digits"] = max(state["int_digits"], int(int_digits.max()))
+            if parts.shape[1] > 1:
+                state["scale"] = max(state["scale"], int(parts[1].fillna("").str.len().max()))
+    if "float" in candidates and pd.to_numeric(values, errors="coerce").isna().any():
+        candidates.discard("float")
+    if "date" in candidates:
+        if not values.str.fullmatch(_DATE_RE).all() or pd.to_datetime(
+            values, format="%Y-%m-%d", errors="coerce"
+        ).isna().any():
+            candidates.discard("date")
+    if "timestamp_ntz" in candidates and not values.str.fullmatch(_TIMESTAMP_RE).all():
+        candidates.discard("timestamp_ntz")
+    if "timestamp_tz" in candidates and not values.str.fullmatch(_TIMESTAMP_RE + _TZ_RE).all():
+        candidates.discard("timestamp_tz")
+
+
+def _column_type(state):
+    """Pick the narrowest Snowflake type left for a column (NUMBER and VARCHAR at full width)."""
+    candidates = state["candidates"]
+    if not state["seen"]:
+        return "VARCHAR"
+    if "boolean" in candidates:
+        return "BOOLEAN"
+    precision = state["int_digits"] + state["scale"]
+    if "integer" in candidates or "decimal" in candidates:
+        if precision > 38:
+            # Exact numbers too wide for NUMBER: keep the digits rather than round through FLOAT
+            return "VARCHAR"
+        if "integer" in candidates:
+            return "NUMBER(38,0)"
+        return f"NUMBER(38,{state['scale']})"
+    if "float" in candidates:
+        return "FLOAT"
+    if "date" in candidates:
+        return "DATE"
+    if "timestamp_ntz" in candidates:
+        return "TIMESTAMP_NTZ"
+    if "timestamp_tz" in candidates:
+        return "TIMESTAMP_TZ"
+    return "VARCHAR"
+
+
+def infer_column_types(csv_paths, sample_rows=0, chunk_rows=100000):
+    """Return [(column, snowflake_type), ...] for CSV files sharing one header (first sample_rows rows if > 0)."""
+    import pandas as pd
+    states = None
+    columns = None
+    remaining = sample_rows if sample_rows > 0 else None
+    for csv_path in csv_paths:
+        chunks = pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+        for df in chunks:
+            if columns is None:
+                columns = list(df.columns)
+                states = [_new_state() for _ in columns]
+            if remaining is not None:
+                df = df.iloc[:remaining]
+                remaining -= len(df)
+            for col, state in zip(df.columns, states):
+                values = df[col]
+                _update(state, values[values != ""])
+            if remaining is not None and remaining <= 0:
+                break
+        if columns is None:
+            # Header-only file: no chunks, but the header still defines the columns
+            columns = list(pd.read_csv(csv_path, nrows=0).columns)
+            states = [_new_state() for _ in columns]
+        if remaining is not None and remaining <= 0:
+            break
+    return [(col.upper(), _column_type(state)) for col, state in zip(columns or [], states or [])]
+
+
+def typed_table_ddl(table_name, column_types):
+    """CREATE TABLE IF NOT EXISTS with ${database}/${schema} placeholders (see run_ddl_file)."""
+    cols = ",\n".join(f'  "{name}" {sf_type}' for name, sf_type in column_types)
+    return f'CREATE TABLE IF NOT EXISTS ${{database}}.${{schema}}."{table_name}" (\n{cols}\n);\n'
@@ -1,95 +1,391 @@
 #!/usr/bin/env python3
 """
-Export tables from a Snowflake database/schema to CSV files and optional DDL.
+Export tables from a Snowflake database/schema to CSV (or Parquet) files and optional DDL.
 Uses only environment variables for connection and target database/schema.
 No credentials or account names are written to any file in the repo.
 """
+import hashlib
+import json
 import os
+import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from dotenv import load_dotenv
+from run_metrics import RunMetrics, add, attach, current_record, phase, query_id
+from snowflake_catalog import discover_catalog, tables_by_schema
+from snowflake_connection import ConnectionPool, bulk_ddl, connect, env_flag, int_env
+from sql_statements import split_sql_statements, table_statement_name
+from subset_plan import DEFAULT_RELATIONSHIPS, parse_relationships, subset_filters
+from table_fingerprints import fingerprint_tables
+
+# (schema, table) -> WHERE predicate for a subset export; filled by plan_subset()
+SUBSET_FILTERS = {}
+# (schema, table) -> number of hash partitions; filled by route_partitioned_tables()
+PARTITIONED = {}
 
-# Load .env from script directory, then from parent (e.g. home dir) if needed
-_script_dir = Path(__file__).resolve().parent
-load_dotenv(_script_dir / ".env")
-load_dotenv(_script_dir.parent / ".env")
 
 def get_connection():
-    """Build connection params from environment. Use a PAT as SNOWFLAKE_PASSWORD (not your account password)."""
-    account = os.getenv("SNOWFLAKE_ACCOUNT")
-    user = os.getenv("SNOWFLAKE_USER")
-    password = os.getenv("SNOWFLAKE_PASSWORD")
-    warehouse = os.getenv("SNOWFLAKE_WAREHOUSE")
-    role = os.getenv("SNOWFLAKE_ROLE")
-    for name, val in [("SNOWFLAKE_ACCOUNT", account), ("SNOWFLAKE_USER", user),
-                     ("SNOWFLAKE_PASSWORD", password), ("SNOWFLAKE_WAREHOUSE", warehouse)]:
-        if not val:
-            print(f"Missing required env: {name}. Set in .env or environment.", file=sys.stderr)
-            sys.exit(1)
+    """Connect to the export database/schema. Use a PAT as SNOWFLAKE_PASSWORD (not your account password)."""
     database = os.getenv("SNOWFLAKE_EXPORT_DATABASE") or os.getenv("SNOWFLAKE_DATABASE")
     schema = os.getenv("SNOWFLAKE_EXPORT_SCHEMA") or os.getenv("SNOWFLAKE_SCHEMA")
     if not database or not schema:
         print("Set SNOWFLAKE_EXPORT_DATABASE and SNOWFLAKE_EXPORT_SCHEMA (or SNOWFLAKE_DATABASE and SNOWFLAKE_SCHEMA).", file=sys.stderr)
         sys.exit(1)
-    if account and ".snowflakecomputing.com" in account:
-        account = account.replace(".snowflakecomputing.com", "")
-    import snowflake.connector
-    conn = snowflake.connector.connect(
-        account=account,
-        user=user,
-        password=password,
-        warehouse=warehouse,
-        role=role,
-        database=database,
-        schema=schema,
-    )
-    return conn, database, schema
+    return connect(database, schema), database, schema
 
 
 def list_schemas(conn, database):
-    """Return list of schema names in the given database (excluding INFORMATION_SCHEMA)."""
-    cur = conn.cursor()
-    try:
-        cur.execute(f'SHOW SCHEMAS IN DATABASE "{database}"')
-        rows = cur.fetchall()
-        # name is index 1
-        return [row[1] for row in rows if row[1] != "INFORMATION_SCHEMA"] if rows else []
-    finally:
-        cur.close()
+    """Return list of schema names in the given database that contain tables (excluding INFORMATION_SCHEMA)."""
+    return list(tables_by_schema(discover_catalog(conn, database)))
 
 
 def list_tables(conn, database, schema):
     """Return list of table names in the given database.schema."""
-    cur = conn.cursor()
-    try:
-        cur.execute("SHOW TABLES IN SCHEMA " + f'"{database}"."{schema}"')
-        rows = cur.fetchall()
-        return [row[1] for row in rows] if rows else []
-    finally:
-        cur.close()
+    return tables_by_schema(discover_catalog(conn, database)).get(schema, [])
 
 
-def export_table_to_csv(conn, database, schema, table_name, out_path):
-    """Export a single table to CSV. Optional: set SNOWFLAKE_EXPORT_LIMIT for max rows (e.g. 1000)."""
-    import csv
+def select_sql(database, schema, table_name, part=None):
+    """SELECT * for one table (subset filter, else SNOWFLAKE_EXPORT_LIMIT); part=(i, n) selects hash partition i of n."""
+    conditions = []
+    if (schema, table_name) in SUBSET_FILTERS:
+        conditions.append(SUBSET_FILTERS[(schema, table_name)])
+    if part is not None:
+        key = os.getenv("SNOWFLAKE_EXPORT_PARTITION_KEY", "").strip() or "*"
+        conditions.append(f"ABS(MOD(HASH({key}), {part[1]})) = {part[0]}")
+    if conditions:
+        where = " AND ".join(conditions) if len(conditions) == 1 else " AND ".join(f"({c})" for c in conditions)
+        return f'SELECT * FROM "{database}"."{schema}"."{table_name}" WHERE {where}'
     limit = os.getenv("SNOWFLAKE_EXPORT_LIMIT")
     limit_clause = f" LIMIT {int(limit)}" if limit and str(limit).isdigit() else ""
+    return f'SELECT * FROM "{database}"."{schema}"."{table_name}"{limit_clause}'
+
+
+def _subset_settings():
+    """SNOWFLAKE_EXPORT_SUBSET_* settings, or None when no subset root is set."""
+    root = os.getenv("SNOWFLAKE_EXPORT_SUBSET_ROOT", "").strip().upper()
+    if not root:
+        return None
+    percent = os.getenv("SNOWFLAKE_EXPORT_SUBSET_PERCENT", "1").strip()
+    seed = os.getenv("SNOWFLAKE_EXPORT_SUBSET_SEED", "0").strip()
+    try:
+        if not 0 < float(percent) <= 100:
+            raise ValueError
+        int(seed)
+    except ValueError:
+        raise SystemExit("SNOWFLAKE_EXPORT_SUBSET_PERCENT must be in (0, 100] and SNOWFLAKE_EXPORT_SUBSET_SEED an integer.")
+    return {
+        "root": root,
+        "percent": percent,
+        "seed": seed,
+        "key": os.getenv("SNOWFLAKE_EXPORT_SUBSET_KEY", "").strip().upper() or None,
+        "relationships": os.getenv("SNOWFLAKE_EXPORT_SUBSET_RELATIONSHIPS", "").strip() or DEFAULT_RELATIONSHIPS,
+    }
+
+
+def plan_subset(database, catalog):
+    """Fill SUBSET_FILTERS for every schema that has the SNOWFLAKE_EXPORT_SUBSET_ROOT table; returns the number of filtered tables."""
+    SUBSET_FILTERS.clear()
+    settings = _subset_settings()
+    if settings is None:
+        return 0
+    relationships = parse_relationships(settings["relationships"])
+    for schema_name, tables in tables_by_schema(catalog).items():
+        filters = subset_filters(
+            database, schema_name, set(tables), settings["root"], settings["percent"],
+            seed=settings["seed"], relationships=relationships, key=settings["key"],
+        )
+        for name, where in filters.items():
+            SUBSET_FILTERS[(schema_name, name)] = where
+    return len(SUBSET_FILTERS)
+
+
+def _export_batch_size():
+    """Rows per fetchmany() in the python CSV writer (SNOWFLAKE_EXPORT_BATCH_SIZE, default 10000)."""
+    return int_env("SNOWFLAKE_EXPORT_BATCH_SIZE", 10000, minimum=1)
+
+
+def _csv_writer():
+    """CSV serializer (SNOWFLAKE_EXPORT_CSV_WRITER: python or arrow, default python)."""
+    writer = os.getenv("SNOWFLAKE_EXPORT_CSV_WRITER", "python").strip().lower()
+    return writer if writer in ("arrow", "python") else "python"
+
+
+# cursor.description type codes of TIMESTAMP_LTZ and TIMESTAMP_TZ: their Arrow batches hold UTC
+# values, while fetchmany() returns each value in its own offset (TZ) or the session time zone (LTZ)
+_ROW_WRITER_CODES = {6, 7}
+
+
+def _str_column(column):
+    """Format one Arrow column exactly like str(value) on fetchmany() rows, NULL as ""."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.types as pat
+    t = column.type
+    if pat.is_string(t) or pat.is_large_string(t):
+        return pc.fill_null(column, "").to_pylist()
+    if pat.is_integer(t) or pat.is_date(t) or (pat.is_decimal(t) and t.scale <= 6):
+        # Same text as str(int) / str(date) / str(Decimal) (Decimal only switches to exponent
+        # notation beyond 6 fractional digits)
+        return pc.fill_null(pc.cast(column, pa.string()), "").to_pylist()
+    if pat.is_boolean(t):
+        return pc.fill_null(pc.if_else(column, "True", "False"), "").to_pylist()
+    if pat.is_binary(t) or pat.is_large_binary(t):
+        # fetchmany() returns bytearray for BINARY
+        return [str(bytearray(v)) if v is not None else "" for v in column.to_pylist()]
+    if pat.is_timestamp(t) and t.tz is None:
+        # fetchmany() returns datetime, which keeps microseconds of a TIMESTAMP_NTZ(9)
+        column = pc.cast(column, pa.timestamp("us"), safe=False)
+    elif pat.is_time(t):
+        column = pc.cast(column, pa.time64("us"), safe=False)
+    # FLOAT, TIME, TIMESTAMP_NTZ, wide decimals: Arrow's text differs from Python's, format per value
+    return [str(v) if v is not None else "" for v in column.to_pylist()]
+
+
+def write_arrow_batches_csv(batches, writer):
+    """Write Arrow record batches as CSV rows, one column conversion and one writerows() per batch."""
+    total = 0
+    batches = iter(batches)
+    while True:
+        with phase("fetch"):
+            batch = next(batches, None)
+        if batch is None:
+            break
+        with phase("write"):
+            columns = [_str_column(column) for column in batch.columns]
+            writer.writerows(zip(*columns))
+        total += batch.num_rows
+    return total
+
+
+def export_table_to_csv(conn, database, schema, table_name, out_path, batch_size=None):
+    """Export a single table to CSV, streamed in batches (SNOWFLAKE_EXPORT_CSV_WRITER selects the python or arrow writer)."""
+    batch_size = batch_size or _export_batch_size()
     cur = conn.cursor()
     try:
-        cur.execute(f'SELECT * FROM "{database}"."{schema}"."{table_name}"{limit_clause}')
-        columns = [d[0] for d in cur.description]
-        rows = cur.fetchall()
+        cur.arraysize = batch_size
+        with phase("query"):
+            cur.execute(select_sql(database, schema, table_name))
+        query_id(cur)
+        return write_csv_results(cur, out_path, batch_size)
     finally:
         cur.close()
+
+
+def write_csv_results(cur, out_path, batch_size=None):
+    """Write the cursor's current result set to out_path as CSV; returns the number of rows."""
+    import csv
+    import snowflake.connector.errors
+    batch_size = batch_size or _export_batch_size()
+    total = 0
+    columns = [d[0] for d in cur.description]
+    batches = None
+    # TIMESTAMP_TZ/LTZ values keep their offset only in fetchmany() rows, so those results use the row writer
+    if _csv_writer() == "arrow" and not any(d[1] in _ROW_WRITER_CODES for d in cur.description):
+        try:
+            batches = cur.fetch_arrow_batches()
+        except snowflake.connector.errors.NotSupportedError:
+            # Result not in Arrow format (e.g. JSON result format); use the row writer
+            batches = None
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(columns)
-        for row in rows:
-            writer.writerow(
-                str(c) if c is not None else "" for c in row
+        if batches is not None:
+            return write_arrow_batches_csv(batches, writer)
+        while True:
+            with phase("fetch"):
+                rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            with phase("write"):
+                writer.writerows(
+                    [str(c) if c is not None else "" for c in row] for row in rows
+                )
+            total += len(rows)
+    return total
+
+
+def _export_format():
+    """Output format for table data (SNOWFLAKE_EXPORT_FORMAT: csv or parquet, default csv)."""
+    fmt = os.getenv("SNOWFLAKE_EXPORT_FORMAT", "csv").strip().lower()
+    if fmt not in ("csv", "parquet"):
+        print(f"Unsupported SNOWFLAKE_EXPORT_FORMAT: {fmt} (use csv or parquet).", file=sys.stderr)
+        sys.exit(1)
+    return fmt
+
+
+def export_table_to_parquet(conn, database, schema, table_name, out_path):
+    """Export a single table to Parquet with native column types, one Arrow batch at a time."""
+    cur = conn.cursor()
+    try:
+        with phase("query"):
+            cur.execute(select_sql(database, schema, table_name))
+        query_id(cur)
+        return write_parquet_results(cur, out_path)
+    finally:
+        cur.close()
+
+
+# cursor.description type codes (snowflake.connector.constants.FIELD_TYPES) with a fixed Arrow type
+_TIMESTAMP_CODES = {4: None, 6: "UTC", 7: "UTC", 8: None}
+
+
+def _description_arrow_type(column):
+    import pyarrow as pa
+    type_code, precision, scale = column[1], column[4], column[5]
+    if type_code == 0:
+        if scale:
+            return pa.decimal128(precision or 38, scale)
+        return pa.int64()
+    if type_code in _TIMESTAMP_CODES:
+        return pa.timestamp("ns", tz=_TIMESTAMP_CODES[type_code])
+    return {
+        1: pa.float64(), 3: pa.date32(), 11: pa.binary(), 12: pa.time64("ns"), 13: pa.bool_(),
+    }.get(type_code, pa.string())
+
+
+def description_schema(description):
+    """Arrow schema of a result from cursor.description, as the connector's Arrow batches type it (for empty results)."""
+    import pyarrow as pa
+    return pa.schema([(d[0], _description_arrow_type(d)) for d in description])
+
+
+def _parquet_schema(schema):
+    """The first batch's schema with integers widened to int64 (the connector narrows them per result chunk)."""
+    import pyarrow as pa
+    import pyarrow.types as pat
+    return pa.schema([
+        field.with_type(pa.int64()) if pat.is_integer(field.type) else field for field in schema
+    ])
+
+
+def write_parquet_results(cur, out_path):
+    """Write the cursor's current result set to out_path as Parquet; returns the number of rows."""
+    import pyarrow.parquet as pq
+    compression = os.getenv("SNOWFLAKE_EXPORT_PARQUET_COMPRESSION", "zstd").strip().lower()
+    total = 0
+    writer = None
+    try:
+        batches = cur.fetch_arrow_batches()
+        while True:
+            with phase("fetch"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            with phase("write"):
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, _parquet_schema(batch.schema), compression=compression)
+                if not batch.schema.equals(writer.schema):
+                    batch = batch.cast(writer.schema)
+                writer.write_table(batch)
+            total += batch.num_rows
+        if writer is None:
+            # Empty result: no Arrow batches, so the column types come from the result metadata
+            pq.write_table(description_schema(cur.description).empty_table(), out_path, compression=compression)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def _stage_key(database, schema, table_name):
+    """Stage subdirectory for a table: safe characters only, plus a hash of the exact names."""
+    digest = hashlib.sha1(f"{database}\0{schema}\0{table_name}".encode("utf-8")).hexdigest()[:10]
+    safe = "/".join(re.sub(r"[^A-Za-z0-9_-]", "_", part) for part in (database, schema, table_name))
+    return f"{safe}_{digest}"
+
+
+def unload_table(conn, database, schema, table_name, out_dir):
+    """Export a table server-side: COPY INTO the user stage, then parallel GET into out_dir; returns the rows unloaded."""
+    max_file_size = int_env("SNOWFLAKE_EXPORT_UNLOAD_MAX_FILE_SIZE", 256 * 1024 * 1024, minimum=1)
+    parallel = min(int_env("SNOWFLAKE_EXPORT_GET_PARALLEL", 8, minimum=1), 99)
+    if _export_format() == "parquet":
+        file_format = "TYPE = PARQUET COMPRESSION = SNAPPY"
+    else:
+        file_format = (
+            "TYPE = CSV COMPRESSION = GZIP FIELD_OPTIONALLY_ENCLOSED_BY = '\"' "
+            "NULL_IF = ('') EMPTY_FIELD_AS_NULL = FALSE"
+        )
+    stage_path = f"@~/sunspectra_export/{_stage_key(database, schema, table_name)}/"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old_part in out_dir.iterdir():
+        if old_part.is_file():
+            old_part.unlink()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"REMOVE '{stage_path}'")
+        with phase("unload"):
+            cur.execute(
+                f"COPY INTO '{stage_path}part' FROM ({select_sql(database, schema, table_name)}) "
+                f"FILE_FORMAT = ({file_format}) HEADER = TRUE MAX_FILE_SIZE = {max_file_size} OVERWRITE = TRUE"
             )
-    return len(rows)
+        query_id(cur)
+        columns = [d[0].lower() for d in cur.description]
+        rows_idx = columns.index("rows_unloaded")
+        total = sum(row[rows_idx] for row in cur.fetchall())
+        with phase("download"):
+            cur.execute(f"GET '{stage_path}' 'file://{out_dir.resolve().as_posix()}/' PARALLEL = {parallel}")
+        query_id(cur)
+        cur.execute(f"REMOVE '{stage_path}'")
+    finally:
+        cur.close()
+    return total
+
+
+def export_table_partitioned(conn, database, schema, table_name, out_dir, parts):
+    """Export a table as `parts` hash partitions fetched concurrently into out_dir/part-NNNN files; returns the rows exported."""
+    suffix = ".parquet" if _export_format() == "parquet" else ".csv"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old_part in out_dir.iterdir():
+        if old_part.is_file():
+            old_part.unlink()
+
+    record = current_record()
+
+    def _export_part(i):
+        out_path = out_dir / f"part-{i:04d}{suffix}"
+        with attach(record):
+            cur = conn.cursor()
+            try:
+                cur.arraysize = _export_batch_size()
+                with phase("query"):
+                    cur.execute(select_sql(database, schema, table_name, part=(i, parts)))
+                query_id(cur)
+                if suffix == ".parquet":
+                    return write_parquet_results(cur, out_path)
+                return write_csv_results(cur, out_path)
+            finally:
+                cur.close()
+
+    with ThreadPoolExecutor(max_workers=parts) as executor:
+        return sum(executor.map(_export_part, range(parts)))
+
+
+def remove_other_outputs(out_path):
+    """Delete the table's outputs next to out_path in another format or layout, which the loader would pick instead."""
+    import shutil
+    name = out_path.stem if out_path.suffix in (".csv", ".parquet") else out_path.name
+    for other in (out_path.parent / f"{name}.csv", out_path.parent / f"{name}.parquet", out_path.parent / name):
+        if other == out_path:
+            continue
+        if other.is_file():
+            other.unlink()
+        elif other.is_dir() and all(p.is_file() and p.name.startswith("part") for p in other.iterdir()):
+            shutil.rmtree(other)
+
+
+def export_table_data(conn, database, schema, table_name, out_path):
+    """Export one table to out_path: .csv or .parquet file, or a part-file directory when it has no suffix."""
+    remove_other_outputs(out_path)
+    if (schema, table_name) in PARTITIONED:
+        parts = PARTITIONED[(schema, table_name)]
+        return export_table_partitioned(conn, database, schema, table_name, out_path, parts)
+    if out_path.suffix == ".parquet":
+        return export_table_to_parquet(conn, database, schema, table_name, out_path)
+    if out_path.suffix == "":
+        return unload_table(conn, database, schema, table_name, out_path)
+    return export_table_to_csv(conn, database, schema, table_name, out_path)
 
 
 def export_ddl(conn, database, schema, table_name, out_dir):
@@ -97,11 +393,13 @@ def export_ddl(conn, database, schema, table_name, out_dir):
     import snowflake.connector.errors
     cur = conn.cursor()
     try:
-        cur.execute(
-            "SELECT GET_DDL('TABLE', %s)",
-            [f'"{database}"."{schema}"."{table_name}"'],
-        )
-        row = cur.fetchone()
+        with phase("ddl"):
+            cur.execute(
+                "SELECT GET_DDL('TABLE', %s)",
+                [f'"{database}"."{schema}"."{table_name}"'],
+            )
+            row = cur.fetchone()
+        query_id(cur)
     except snowflake.connector.errors.ProgrammingError:
         # e.g. shared database does not support GET_DDL
         return
@@ -109,8 +407,12 @@ def export_ddl(conn, database, schema, table_name, out_dir):
         cur.close()
     if not row or not row[0]:
         return
-    ddl = row[0]
-    # Remove account-specific identifiers (e.g. stage URLs, account locator)
+    out_path = out_dir / f"{table_name}.sql"
+    out_path.write_text(clean_ddl(row[0]), encoding="utf-8")
+
+
+def clean_ddl(ddl):
+    """Remove account-specific identifiers (e.g. stage URLs, account locator) from DDL text."""
     lines = ddl.split("\n")
     cleaned = []
     for line in lines:
@@ -120,8 +422,420 @@ def export_ddl(conn, database, schema, table_name, out_dir):
             cleaned.append(line)
         elif line.strip():
             cleaned.append("  -- (omitted account-specific clause)")
-    out_path = out_dir / f"{table_name}.sql"
-    out_path.write_text("\n".join(cleaned) + "\n", encoding="utf-8")
+    return "\n".join(cleaned) + "\n"
+
+
+def export_schema_ddl(conn, database, schema, table_names, out_dir):
+    """Export DDL for many tables with one GET_DDL('SCHEMA', ...) call; returns the tables written (empty if not permitted)."""
+    import snowflake.connector.errors
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_DDL('SCHEMA', %s)", [f'"{database}"."{schema}"'])
+        row = cur.fetchone()
+    except snowflake.connector.errors.ProgrammingError:
+        return set()
+    finally:
+        cur.close()
+    if not row or not row[0]:
+        return set()
+    return write_schema_ddl(row[0], table_names, out_dir)
+
+
+def write_schema_ddl(schema_ddl, table_names, out_dir):
+    """Write each table's statements from GET_DDL('SCHEMA') output to out_dir/<table>.sql; returns the tables written."""
+    statements = {}
+    for stmt in split_sql_statements(schema_ddl):
+        parsed = table_statement_name(stmt)
+        if parsed is None:
+            continue
+        kind, name = parsed
+        if kind == "create":
+            statements[name] = [stmt]
+        elif name in statements:
+            statements[name].append(stmt)
+    written = set()
+    for name in table_names:
+        if name in statements:
+            ddl = "\n".join(stmt + ";" for stmt in statements[name])
+            (out_dir / f"{name}.sql").write_text(clean_ddl(ddl), encoding="utf-8")
+            written.add(name)
+    return written
+
+
+def export_bulk_ddl(conn, database, work_items):
+    """Write DDL with one GET_DDL('SCHEMA') per schema; returns the work items, with ddl_dir None for tables written."""
+    by_schema = {}
+    for schema_name, name, _, ddl_dir, _ in work_items:
+        by_schema.setdefault((schema_name, ddl_dir), []).append(name)
+    written = set()
+    if _async_queries():
+        # Submit every schema's GET_DDL at once, then collect them in order
+        query_ids = {
+            key: submit_async(conn, "SELECT GET_DDL('SCHEMA', %s)", [f'"{database}"."{key[0]}"'])
+            for key in by_schema
+        }
+        for (schema_name, ddl_dir), names in by_schema.items():
+            row = fetch_async_row(conn, query_ids[(schema_name, ddl_dir)])
+            if row and row[0]:
+                for name in write_schema_ddl(row[0], names, ddl_dir):
+                    written.add((schema_name, name))
+    else:
+        for (schema_name, ddl_dir), names in by_schema.items():
+            for name in export_schema_ddl(conn, database, schema_name, names, ddl_dir):
+                written.add((schema_name, name))
+    return [
+        (schema_name, name, out_path, None if (schema_name, name) in written else ddl_dir, label)
+        for schema_name, name, out_path, ddl_dir, label in work_items
+    ]
+
+
+def _export_workers():
+    """Number of tables exported concurrently (SNOWFLAKE_EXPORT_WORKERS, default 4)."""
+    return int_env("SNOWFLAKE_EXPORT_WORKERS", 4, minimum=1)
+
+
+def _async_queries():
+    """Whether to submit queries with execute_async on one connection (SNOWFLAKE_EXPORT_ASYNC)."""
+    return env_flag("SNOWFLAKE_EXPORT_ASYNC")
+
+
+def submit_async(conn, sql, params=None):
+    """Submit a query with execute_async and return its query ID without waiting for it."""
+    cur = conn.cursor()
+    try:
+        cur.execute_async(sql, params)
+        return cur.sfqid
+    finally:
+        cur.close()
+
+
+def wait_any(conn, query_ids, max_interval=1.0):
+    """Poll with backoff until one of query_ids has finished; returns (query_id, error or None)."""
+    import snowflake.connector.errors
+    interval = 0.05
+    while True:
+        for qid in query_ids:
+            try:
+                status = conn.get_query_status_throw_if_error(qid)
+            except snowflake.connector.errors.ProgrammingError as e:
+                return qid, e
+            if not conn.is_still_running(status):
+                return qid, None
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def fetch_async_row(conn, qid):
+    """Wait for an async query and return its first row, or None if it failed (e.g. GET_DDL not allowed)."""
+    _, error = wait_any(conn, [qid])
+    if error is not None:
+        return None
+    cur = conn.cursor()
+    try:
+        cur.get_results_from_sfqid(qid)
+        return cur.fetchone()
+    finally:
+        cur.close()
+
+
+def export_tables_async(conn, database, work_items, on_done=None):
+    """Export work items on one connection, submitting their queries with execute_async."""
+    max_inflight = int_env("SNOWFLAKE_EXPORT_ASYNC_MAX_INFLIGHT", 16, minimum=1)
+    metrics = RunMetrics("export", len(work_items))
+    pending = list(reversed(work_items))
+    # query ID -> (work item, "data" or "ddl", submit time)
+    inflight = {}
+
+    def _done(item, n):
+        metrics.report(f"  {item[4]} -> {n} rows")
+        if on_done:
+            on_done(item, n)
+
+    while pending or inflight:
+        while pending and len(inflight) < max_inflight:
+            item = pending.pop()
+            schema_name, name, out_path, ddl_dir, _ = item
+            if out_path.suffix == "":
+                with metrics.item(f"{schema_name}.{name}", file=out_path.name):
+                    n = export_table_data(conn, database, schema_name, name, out_path)
+                    add(rows=n, bytes=_path_bytes(out_path))
+                    if ddl_dir is not None:
+                        export_ddl(conn, database, schema_name, name, ddl_dir)
+                _done(item, n)
+                continue
+            submitted = time.perf_counter()
+            inflight[submit_async(conn, select_sql(database, schema_name, name))] = (item, "data", submitted)
+            if ddl_dir is not None:
+                qid = submit_async(conn, "SELECT GET_DDL('TABLE', %s)", [f'"{database}"."{schema_name}"."{name}"'])
+                inflight[qid] = (item, "ddl", submitted)
+        if not inflight:
+            continue
+        qid, error = wait_any(conn, list(inflight))
+        item, kind, submitted = inflight.pop(qid)
+        schema_name, name, out_path, ddl_dir, _ = item
+        if kind == "ddl":
+            # Like export_ddl: skip tables whose DDL cannot be read (e.g. shared databases)
+            if error is None:
+                row = fetch_async_row(conn, qid)
+                if row and row[0]:
+                    (ddl_dir / f"{name}.sql").write_text(clean_ddl(row[0]), encoding="utf-8")
+            continue
+        with metrics.item(f"{schema_name}.{name}", file=out_path.name) as record:
+            record["phases"]["query"] = round(time.perf_counter() - submitted, 6)
+            record["query_ids"].append(qid)
+            if error is not None:
+                raise error
+            remove_other_outputs(out_path)
+            cur = conn.cursor()
+            try:
+                cur.get_results_from_sfqid(qid)
+                if out_path.suffix == ".parquet":
+                    n = write_parquet_results(cur, out_path)
+                else:
+                    n = write_csv_results(cur, out_path)
+            finally:
+                cur.close()
+            add(rows=n, bytes=_path_bytes(out_path))
+        _done(item, n)
+    metrics.summary()
+    return len(work_items)
+
+
+def export_tables(conn, database, work_items, workers=None, on_done=None):
+    """Export (schema, table, out_path, ddl_dir, label) work items; returns the number exported."""
+    if _async_queries():
+        return export_tables_async(conn, database, work_items, on_done=on_done)
+    workers = min(workers or _export_workers(), len(work_items))
+    metrics = RunMetrics("export", len(work_items))
+
+    def _export_with(table_conn, item):
+        schema_name, name, out_path, ddl_dir, _ = item
+        with metrics.item(f"{schema_name}.{name}", file=out_path.name):
+            n = export_table_data(table_conn, database, schema_name, name, out_path)
+            add(rows=n, bytes=_path_bytes(out_path))
+            if ddl_dir is not None:
+                export_ddl(table_conn, database, schema_name, name, ddl_dir)
+        return n
+
+    if workers <= 1:
+        for item in work_items:
+            n = _export_with(conn, item)
+            metrics.report(f"  {item[4]} -> {n} rows")
+            if on_done:
+                on_done(item, n)
+        metrics.summary()
+        return len(work_items)
+
+    pool = ConnectionPool(lambda: get_connection()[0], workers)
+
+    def _export_one(item):
+        with pool.connection() as worker_conn:
+            return _export_with(worker_conn, item)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [executor.submit(_export_one, item) for item in work_items]
+    try:
+        for item, future in zip(work_items, futures):
+            n = future.result()
+            metrics.report(f"  {item[4]} -> {n} rows")
+            if on_done:
+                on_done(item, n)
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        pool.close_all()
+    metrics.summary()
+    return len(work_items)
+
+
+def load_manifest(manifest_path, database):
+    """Read data/manifest.json; returns an empty manifest if missing or for another database."""
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("database") == database:
+            return manifest
+    return {"database": database, "tables": {}}
+
+
+def save_manifest(manifest_path, manifest):
+    """Write the export manifest atomically (write to a temp file, then rename)."""
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    tmp_path.replace(manifest_path)
+
+
+def _data_files(path):
+    """The file itself, or the sorted part files of a data/SCHEMA/TABLE/ directory."""
+    return sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+
+
+def _path_bytes(path):
+    return sum(p.stat().st_size for p in _data_files(path))
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    for part in _data_files(path):
+        if path.is_dir():
+            digest.update(part.name.encode("utf-8"))
+        with open(part, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _export_settings():
+    """Settings that change file contents; a manifest entry is stale if they differ."""
+    return {
+        "format": _export_format(),
+        "limit": os.getenv("SNOWFLAKE_EXPORT_LIMIT") or None,
+        "subset": _subset_settings(),
+    }
+
+
+def plan_incremental(work_items, metadata, manifest):
+    """Split work items into (to_export, unchanged) using source metadata and the manifest."""
+    settings = _export_settings()
+    to_export, unchanged = [], []
+    for item in work_items:
+        schema_name, name, out_path, _, _ = item
+        entry = manifest["tables"].get(f"{schema_name}.{name}")
+        source = metadata.get((schema_name, name))
+        if (
+            entry is not None
+            and source is not None
+            and entry.get("last_altered") == source["last_altered"]
+            and entry.get("row_count") == source["row_count"]
+            and entry.get("settings") == settings
+            and out_path.exists()
+            and _path_bytes(out_path) == entry.get("file_bytes")
+        ):
+            unchanged.append(item)
+        else:
+            to_export.append(item)
+    # A subset table's rows depend on its related tables, so re-export the schema's whole subset together
+    stale = {schema_name for schema_name, name, _, _, _ in to_export if (schema_name, name) in SUBSET_FILTERS}
+    if stale:
+        to_export += [item for item in unchanged if item[0] in stale and (item[0], item[1]) in SUBSET_FILTERS]
+        unchanged = [item for item in unchanged if item not in to_export]
+    return to_export, unchanged
+
+
+def _incremental_export():
+    return env_flag("SNOWFLAKE_EXPORT_INCREMENTAL")
+
+
+def route_large_tables(work_items, metadata, data_dir):
+    """Send tables above SNOWFLAKE_EXPORT_UNLOAD_THRESHOLD_BYTES to unload_table (per-schema layout only)."""
+    threshold = int_env("SNOWFLAKE_EXPORT_UNLOAD_THRESHOLD_BYTES", 1024 ** 3)
+    if threshold <= 0:
+        return work_items
+    routed = []
+    for schema_name, name, out_path, ddl_dir, label in work_items:
+        size = metadata.get((schema_name, name), {}).get("bytes") or 0
+        # Subset tables are filtered down, so source size says nothing about their export size
+        if size > threshold and out_path.parent != data_dir and (schema_name, name) not in SUBSET_FILTERS:
+            out_path = out_path.parent / name
+            label = f"{schema_name}.{name}/ (unload)"
+        routed.append((schema_name, name, out_path, ddl_dir, label))
+    return routed
+
+
+def route_partitioned_tables(work_items, metadata, data_dir):
+    """Send tables above SNOWFLAKE_EXPORT_PARTITION_ROWS source rows to export_table_partitioned (per-schema layout only)."""
+    PARTITIONED.clear()
+    threshold = int_env("SNOWFLAKE_EXPORT_PARTITION_ROWS", 10000000)
+    parts = int_env("SNOWFLAKE_EXPORT_PARTITIONS", 8)
+    if threshold <= 0 or parts < 2 or os.getenv("SNOWFLAKE_EXPORT_LIMIT", "").strip().isdigit():
+        return work_items
+    routed = []
+    for schema_name, name, out_path, ddl_dir, label in work_items:
+        row_count = metadata.get((schema_name, name), {}).get("row_count") or 0
+        if (
+            row_count > threshold
+            and out_path.suffix != ""
+            and out_path.parent != data_dir
+            and (schema_name, name) not in SUBSET_FILTERS
+        ):
+            out_path = out_path.parent / name
+            label = f"{schema_name}.{name}/ ({parts} parts)"
+            PARTITIONED[(schema_name, name)] = parts
+        routed.append((schema_name, name, out_path, ddl_dir, label))
+    return routed
+
+
+def _record_fingerprints():
+    """Whether to store COUNT/HASH_AGG fingerprints in the manifest (SNOWFLAKE_EXPORT_FINGERPRINTS, default on)."""
+    return env_flag("SNOWFLAKE_EXPORT_FINGERPRINTS", True)
+
+
+def record_fingerprints(conn, database, work_items, manifest):
+    """Store each exported table's source COUNT(*) and HASH_AGG(*) in its manifest entry; returns the number stored."""
+    limited = os.getenv("SNOWFLAKE_EXPORT_LIMIT", "").strip().isdigit()
+    queries = {
+        (schema_name, name): select_sql(database, schema_name, name)
+        for schema_name, name, _, _, _ in work_items
+        if not limited or (schema_name, name) in SUBSET_FILTERS
+    }
+    fingerprints = fingerprint_tables(conn, queries)
+    for (schema_name, name), fingerprint in fingerprints.items():
+        entry = manifest["tables"].get(f"{schema_name}.{name}")
+        if entry is not None and fingerprint is not None:
+            entry["fingerprint"] = {"rows": fingerprint[0], "hash_agg": fingerprint[1]}
+    return sum(1 for fingerprint in fingerprints.values() if fingerprint is not None)
+
+
+def _dry_run():
+    return env_flag("SNOWFLAKE_EXPORT_DRY_RUN")
+
+
+def run_export(conn, database, work_items, data_dir, catalog):
+    """Export work items and maintain data/manifest.json; returns the number of tables exported."""
+    manifest_path = data_dir / "manifest.json"
+    manifest = load_manifest(manifest_path, database)
+    metadata = {(entry["schema"], entry["table"]): entry for entry in catalog}
+    if plan_subset(database, catalog):
+        subset = _subset_settings()
+        print(
+            f"Subset export: {len(SUBSET_FILTERS)} tables filtered from {subset['root']} "
+            f"({subset['percent']}%, seed {subset['seed']}); unrelated tables are exported in full"
+        )
+    work_items = route_large_tables(work_items, metadata, data_dir)
+    work_items = route_partitioned_tables(work_items, metadata, data_dir)
+    if _incremental_export():
+        work_items, unchanged = plan_incremental(work_items, metadata, manifest)
+        print(f"Incremental export: {len(work_items)} changed, {len(unchanged)} unchanged (skipped)")
+    if _dry_run():
+        for schema_name, name, _, _, label in work_items:
+            source = metadata.get((schema_name, name), {})
+            print(f"  {label}: {source.get('row_count')} rows, {source.get('bytes')} bytes (dry run)")
+        return 0
+    if bulk_ddl():
+        work_items = export_bulk_ddl(conn, database, work_items)
+    settings = _export_settings()
+
+    def _record(item, n):
+        schema_name, name, out_path, _, _ = item
+        source = metadata.get((schema_name, name), {})
+        manifest["tables"][f"{schema_name}.{name}"] = {
+            "file": out_path.relative_to(data_dir).as_posix(),
+            "rows": n,
+            "row_count": source.get("row_count"),
+            "bytes": source.get("bytes"),
+            "last_altered": source.get("last_altered"),
+            "file_bytes": _path_bytes(out_path),
+            "sha256": _file_sha256(out_path),
+            "settings": settings,
+        }
+        save_manifest(manifest_path, manifest)
+
+    exported = export_tables(conn, database, work_items, on_done=_record)
+    if _record_fingerprints() and work_items:
+        count = record_fingerprints(conn, database, work_items, manifest)
+        save_manifest(manifest_path, manifest)
+        print(f"Recorded COUNT/HASH_AGG fingerprints for {count} tables in {manifest_path.name}")
+    return exported
 
 
 def main():
@@ -130,48 +844,53 @@ def main():
     data_dir.mkdir(exist_ok=True)
     schema_dir.mkdir(exist_ok=True)
 
+    fmt = _export_format()
     conn, database, default_schema = get_connection()
+    # One INFORMATION_SCHEMA.TABLES query instead of SHOW TABLES per schema. Only dry runs (or
+    # SNOWFLAKE_EXPORT_CATALOG_CACHE=1) use the local cache: routing reads its sizes and row counts
+    use_cache = (_dry_run() or env_flag("SNOWFLAKE_EXPORT_CATALOG_CACHE")) and not _incremental_export()
+    catalog = discover_catalog(conn, database, refresh=not use_cache)
+    schema_tables = tables_by_schema(catalog)
 
     # Export all schemas (509 tables across 15 schemas) when SNOWFLAKE_EXPORT_ALL_SCHEMAS=1
-    if os.getenv("SNOWFLAKE_EXPORT_ALL_SCHEMAS", "").strip().lower() in ("1", "true", "yes"):
-        schemas = list_schemas(conn, database)
+    if env_flag("SNOWFLAKE_EXPORT_ALL_SCHEMAS"):
+        schemas = list(schema_tables)
         if not schemas:
             print("No schemas found in database.")
             conn.close()
             return
         print(f"Exporting all tables from {len(schemas)} schemas in {database} to data/SCHEMA_NAME/")
-        total = 0
+        work_items = []
         for schema_name in sorted(schemas):
             schema_dir_per = schema_dir / schema_name
             schema_dir_per.mkdir(parents=True, exist_ok=True)
             out_dir = data_dir / schema_name
             out_dir.mkdir(parents=True, exist_ok=True)
-            tables = list_tables(conn, database, schema_name)
-            for name in tables:
-                csv_path = out_dir / f"{name}.csv"
-                n = export_table_to_csv(conn, database, schema_name, name, csv_path)
-                print(f"  {schema_name}.{name}.csv -> {n} rows")
-                export_ddl(conn, database, schema_name, name, schema_dir_per)
-                total += 1
-        conn.close()
+            for name in schema_tables[schema_name]:
+                work_items.append(
+                    (schema_name, name, out_dir / f"{name}.{fmt}", schema_dir_per, f"{schema_name}.{name}.{fmt}")
+                )
+        try:
+            total = run_export(conn, database, work_items, data_dir, catalog)
+        finally:
+            conn.close()
         print(f"Done. Exported {total} tables across {len(schemas)} schemas.")
         return
 
     # Single-schema export
     schema = default_schema
-    tables = list_tables(conn, database, schema)
+    tables = schema_tables.get(schema, [])
     if not tables:
         print("No tables found in the specified database/schema.")
         conn.close()
         return
 
     print(f"Exporting {len(tables)} tables from {database}.{schema} to data/ and schema/")
-    for name in tables:
-        csv_path = data_dir / f"{name}.csv"
-        n = export_table_to_csv(conn, database, schema, name, csv_path)
-        print(f"  {name}.csv -> {n} rows")
-        export_ddl(conn, database, schema, name, schema_dir)
-    conn.close()
+    work_items = [(schema, name, data_dir / f"{name}.{fmt}", schema_dir, f"{name}.{fmt}") for name in tables]
+    try:
+        run_export(conn, database, work_items, data_dir, catalog)
+    finally:
+        conn.close()
     print("Done.")
 
 
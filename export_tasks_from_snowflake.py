@@ -4,52 +4,59 @@ Export existing Snowflake Tasks from your Snowflake (GET_DDL) into tasks/tasks.s
 Then run generate_tasks.py in the same or another environment to duplicate those tasks.
 
 Uses .env for connection. Set SNOWFLAKE_DATABASE (or SNOWFLAKE_EXPORT_DATABASE) to the database to scan.
+Task DDL is read with one GET_DDL('SCHEMA') per schema that has tasks; tasks it does not
+cover fall back to GET_DDL('TASK') (SNOWFLAKE_EXPORT_BULK_DDL=0 always uses per-task calls).
 Run: python export_tasks_from_snowflake.py
 """
 import os
+import re
 import sys
 from pathlib import Path
 
-from dotenv import load_dotenv
+from run_metrics import RunMetrics, phase, query_id
+from snowflake_connection import bulk_ddl, connect
+from sql_statements import task_statement_name
 
 _script_dir = Path(__file__).resolve().parent
-load_dotenv(_script_dir / ".env")
-load_dotenv(_script_dir.parent / ".env")
 
 
 def get_connection():
     """Connect using env vars. Use a PAT as SNOWFLAKE_PASSWORD."""
-    account = os.getenv("SNOWFLAKE_ACCOUNT")
-    user = os.getenv("SNOWFLAKE_USER")
-    password = os.getenv("SNOWFLAKE_PASSWORD")
-    warehouse = os.getenv("SNOWFLAKE_WAREHOUSE")
-    role = os.getenv("SNOWFLAKE_ROLE")
-    for name, val in [
-        ("SNOWFLAKE_ACCOUNT", account),
-        ("SNOWFLAKE_USER", user),
-        ("SNOWFLAKE_PASSWORD", password),
-        ("SNOWFLAKE_WAREHOUSE", warehouse),
-    ]:
-        if not val:
-            print(f"Missing required env: {name}. Set in .env.", file=sys.stderr)
-            sys.exit(1)
     database = os.getenv("SNOWFLAKE_EXPORT_DATABASE") or os.getenv("SNOWFLAKE_DATABASE")
     if not database:
         print("Set SNOWFLAKE_EXPORT_DATABASE or SNOWFLAKE_DATABASE in .env.", file=sys.stderr)
         sys.exit(1)
-    if account and ".snowflakecomputing.com" in account:
-        account = account.replace(".snowflakecomputing.com", "")
+    return connect(database), database
 
-    import snowflake.connector
-    conn = snowflake.connector.connect(
-        account=account,
-        user=user,
-        password=password,
-        warehouse=warehouse,
-        role=role,
-        database=database,
-    )
-    return conn, database
+
+# GET_DDL('SCHEMA') starts every object's DDL on a new line with "create or replace"
+_OBJECT_START_RE = re.compile(r"^create\s+or\s+replace\s", re.IGNORECASE | re.MULTILINE)
+
+
+def schema_task_ddls(cur, db_name, schema_name, task_names):
+    """Return {task_name: ddl} for task_names from one GET_DDL('SCHEMA') call; empty if the call is not permitted."""
+    import snowflake.connector.errors
+    try:
+        with phase("ddl"):
+            cur.execute("SELECT GET_DDL('SCHEMA', %s)", (f'"{db_name}"."{schema_name}"',))
+            row = cur.fetchone()
+    except snowflake.connector.errors.ProgrammingError:
+        return {}
+    if not row or not row[0]:
+        return {}
+    ddl = row[0]
+    starts = [m.start() for m in _OBJECT_START_RE.finditer(ddl)]
+    headers = []
+    for start in starts:
+        line_end = ddl.find("\n", start)
+        name = task_statement_name(ddl[start:line_end if line_end != -1 else len(ddl)])
+        if name in task_names:
+            headers.append((start, name))
+    ddls = {}
+    for (start, name), end in zip(headers, [start for start, _ in headers[1:]] + [len(ddl)]):
+        if not any(start < other < end for other in starts):
+            ddls[name] = ddl[start:end].strip()
+    return ddls
 
 
 def main():
@@ -77,22 +84,35 @@ def main():
         return
 
     ddls = []
+    bulk = {}
+    if bulk_ddl():
+        for db_name, schema_name in sorted({(row[db_idx], row[schema_idx]) for row in rows}):
+            task_names = {row[name_idx] for row in rows if (row[db_idx], row[schema_idx]) == (db_name, schema_name)}
+            bulk[(db_name, schema_name)] = schema_task_ddls(cur, db_name, schema_name, task_names)
+    metrics = RunMetrics("export_tasks", len(rows))
     for row in rows:
         task_name = row[name_idx]
         db_name = row[db_idx]
         schema_name = row[schema_idx]
         full_name = f'"{db_name}"."{schema_name}"."{task_name}"'
         try:
-            cur.execute("SELECT GET_DDL('TASK', %s)", (full_name,))
-            ddl_row = cur.fetchone()
+            with metrics.item(f"{schema_name}.{task_name}"):
+                if task_name in bulk.get((db_name, schema_name), {}):
+                    ddl_row = (bulk[(db_name, schema_name)][task_name],)
+                else:
+                    with phase("ddl"):
+                        cur.execute("SELECT GET_DDL('TASK', %s)", (full_name,))
+                        ddl_row = cur.fetchone()
+                    query_id(cur)
             if ddl_row and ddl_row[0]:
                 ddls.append(ddl_row[0].strip())
-                print(f"  Exported: {schema_name}.{task_name}")
+                metrics.report(f"  Exported: {schema_name}.{task_name}")
             else:
-                print(f"  Skipped (no DDL): {schema_name}.{task_name}", file=sys.stderr)
+                metrics.report(f"  Skipped (no DDL): {schema_name}.{task_name}", file=sys.stderr)
         except Exception as e:
-            print(f"  Skipped {schema_name}.{task_name}: {e}", file=sys.stderr)
+            metrics.report(f"  Skipped {schema_name}.{task_name}: {e}", file=sys.stderr)
 
+    metrics.summary()
     cur.close()
     conn.close()
 
@@ -1,55 +1,32 @@
 #!/usr/bin/env python3
 """
 Generate and create Snowflake Tasks (scheduled SQL). Uses .env for connection.
-Run: python generate_tasks.py
+Run: python generate_tasks.py [--sync]
 
 If tasks/tasks.sql exists (from export_tasks_from_snowflake.py), runs that DDL to duplicate tasks.
 Otherwise creates tasks from TASK_DEFINITIONS below. Edit TASK_DEFINITIONS to add or change tasks.
+With --sync, only tasks that are missing or differ from SHOW TASKS (warehouse, schedule,
+predecessors, condition, body) are applied, and independent task graphs are applied concurrently.
 Does not add Semantic Model Configuration—tasks run plain SQL only.
 """
+import argparse
+import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from dotenv import load_dotenv
+from run_metrics import RunMetrics, phase, query_id
+from snowflake_connection import ConnectionPool, connect, int_env, require_env
+from sql_statements import object_name, task_statement_header_end, task_statement_name
 
 _script_dir = Path(__file__).resolve().parent
-load_dotenv(_script_dir / ".env")
-load_dotenv(_script_dir.parent / ".env")
 
 
 def get_connection():
     """Connect to Snowflake using env vars. Use a PAT as SNOWFLAKE_PASSWORD."""
-    account = os.getenv("SNOWFLAKE_ACCOUNT")
-    user = os.getenv("SNOWFLAKE_USER")
-    password = os.getenv("SNOWFLAKE_PASSWORD")
-    warehouse = os.getenv("SNOWFLAKE_WAREHOUSE")
-    database = os.getenv("SNOWFLAKE_DATABASE")
-    schema = os.getenv("SNOWFLAKE_SCHEMA")
-    role = os.getenv("SNOWFLAKE_ROLE")
-    for name, val in [
-        ("SNOWFLAKE_ACCOUNT", account),
-        ("SNOWFLAKE_USER", user),
-        ("SNOWFLAKE_PASSWORD", password),
-        ("SNOWFLAKE_WAREHOUSE", warehouse),
-        ("SNOWFLAKE_DATABASE", database),
-        ("SNOWFLAKE_SCHEMA", schema),
-    ]:
-        if not val:
-            raise SystemExit(f"Missing required env: {name}. Set in .env.")
-    if account and ".snowflakecomputing.com" in account:
-        account = account.replace(".snowflakecomputing.com", "")
-
-    import snowflake.connector
-    conn = snowflake.connector.connect(
-        account=account,
-        user=user,
-        password=password,
-        warehouse=warehouse,
-        role=role,
-        database=database,
-        schema=schema,
-    )
-    return conn, database, schema
+    database, schema = require_env("SNOWFLAKE_DATABASE", "SNOWFLAKE_SCHEMA")
+    return connect(database, schema), database, schema
 
 
 # Define tasks: (name, schedule, sql_statement)
@@ -80,31 +57,260 @@ def generate_task_sql(database: str, schema: str, warehouse: str, task_name: str
     )
 
 
-def run_tasks_sql_file(conn, tasks_file: Path) -> bool:
-    """Execute SQL statements from tasks/tasks.sql (from export_tasks_from_snowflake.py). Returns True if ran."""
+def read_task_blocks(tasks_file: Path) -> list:
+    """Statements of tasks/tasks.sql; each exported task DDL is one block (joined with blank lines)."""
     if not tasks_file.exists():
-        return False
+        return []
     content = tasks_file.read_text(encoding="utf-8")
-    # Each exported task DDL is one block (joined with \n\n); don't split on ";" inside definitions
-    blocks = [b.strip() for b in content.split("\n\n") if b.strip() and not b.strip().startswith("--")]
+    # Don't split on ";" inside definitions (Snowflake Scripting bodies contain semicolons)
+    return [b.strip() for b in content.split("\n\n") if b.strip() and not b.strip().startswith("--")]
+
+
+def run_tasks_sql_file(conn, tasks_file: Path) -> bool:
+    """Execute SQL statements from tasks/tasks.sql (from export_tasks_from_snowflake.py). Returns True if ran."""
+    blocks = read_task_blocks(tasks_file)
     if not blocks:
         return False
+    metrics = RunMetrics("tasks", len(blocks))
     cur = conn.cursor()
     try:
-        for stmt in blocks:
-            cur.execute(stmt)
+        for block_no, stmt in enumerate(blocks, 1):
+            with metrics.item(f"tasks.sql#{block_no}"):
+                with phase("execute"):
+                    cur.execute(stmt)
+                query_id(cur)
             # Print task name if it looks like CREATE TASK "db"."schema"."name"
             if "CREATE" in stmt and "TASK" in stmt:
-                print(f"  Created task from tasks/tasks.sql")
+                metrics.report("  Created task from tasks/tasks.sql")
+            else:
+                metrics.report(f"  Ran statement {block_no} from tasks/tasks.sql")
+        metrics.summary()
         return True
     finally:
         cur.close()
 
 
+def _normalize_sql(text) -> str:
+    """Collapse whitespace and drop a trailing semicolon so formatting differences don't count."""
+    return re.sub(r"\s+", " ", (text or "").strip()).rstrip(";").strip()
+
+
+def _unquote(name) -> str:
+    return name[1:-1].replace('""', '"') if name.startswith('"') else name.upper()
+
+
+def parse_task_ddl(stmt: str):
+    """Parse CREATE TASK into {name, warehouse, schedule, predecessors, condition, definition}; None if not a task."""
+    name = task_statement_name(stmt)
+    header_end = task_statement_header_end(stmt)
+    if name is None or header_end < 0:
+        return None
+    header, body = stmt[:header_end], stmt[header_end + 2:]
+    warehouse = re.search(r'\bwarehouse\s*=\s*("(?:[^"]|"")+"|[\w$]+)', header, re.IGNORECASE)
+    schedule = re.search(r"\bschedule\s*=\s*'((?:[^']|'')*)'", header, re.IGNORECASE)
+    after = re.search(r"\bafter\s+(.+?)(?=\s+when\s|$)", header, re.IGNORECASE | re.DOTALL)
+    condition = re.search(r"\bwhen\s+(.+)$", header, re.IGNORECASE | re.DOTALL)
+    return {
+        "name": name,
+        "warehouse": _unquote(warehouse.group(1)) if warehouse else None,
+        "schedule": schedule.group(1).replace("''", "'") if schedule else None,
+        "predecessors": sorted(object_name(p) for p in after.group(1).split(",")) if after else [],
+        "condition": _normalize_sql(condition.group(1)) if condition else None,
+        "definition": _normalize_sql(body),
+    }
+
+
+def _show_predecessors(value) -> list:
+    """Predecessor task names from SHOW TASKS (a JSON array of qualified names, or comma-separated)."""
+    if not value:
+        return []
+    names = json.loads(value) if value.strip().startswith("[") else value.split(",")
+    return sorted(object_name(n.strip()) for n in names if n.strip())
+
+
+def show_tasks(conn, database: str, schema: str) -> dict:
+    """Current tasks in database.schema from one SHOW TASKS, normalized like parse_task_ddl (plus state)."""
+    cur = conn.cursor()
+    try:
+        cur.execute(f'SHOW TASKS IN SCHEMA "{database}"."{schema}"')
+        columns = [d[0].lower() for d in cur.description]
+        rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+    finally:
+        cur.close()
+    return {
+        row["name"]: {
+            "name": row["name"],
+            "warehouse": row.get("warehouse") or None,
+            "schedule": row.get("schedule") or None,
+            "predecessors": _show_predecessors(row.get("predecessors")),
+            "condition": _normalize_sql(row.get("condition")) or None,
+            "definition": _normalize_sql(row.get("definition")),
+            "state": (row.get("state") or "").lower(),
+        }
+        for row in rows
+    }
+
+
+_COMPARED = ("warehouse", "schedule", "predecessors", "condition", "definition")
+
+
+def plan_task_sync(statements: list, current: dict):
+    """Split statements into (changed [(task, stmt)], unchanged task names, other statements)."""
+    changed, unchanged, other = [], [], []
+    for stmt in statements:
+        task = parse_task_ddl(stmt)
+        if task is None:
+            other.append(stmt)
+            continue
+        existing = current.get(task["name"])
+        if existing is not None and all(existing[key] == task[key] for key in _COMPARED):
+            unchanged.append(task["name"])
+        else:
+            changed.append((task, stmt))
+    return changed, unchanged, other
+
+
+def task_graphs(changed: list, current: dict) -> list:
+    """Group changed tasks into independent task graphs, each in dependency order (predecessors first)."""
+    parent = {}
+
+    def _find(name):
+        while parent.setdefault(name, name) != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    edges = [(t["name"], p) for t, _ in changed for p in t["predecessors"]]
+    edges += [(name, p) for name, task in current.items() for p in task["predecessors"]]
+    for child, pred in edges:
+        parent[_find(child)] = _find(pred)
+    groups = {}
+    for task, stmt in changed:
+        groups.setdefault(_find(task["name"]), []).append((task, stmt))
+    ordered = []
+    for items in groups.values():
+        names = {t["name"] for t, _ in items}
+        done, pending, result = set(), list(range(len(items))), []
+        while pending:
+            ready = [i for i in pending if all(p in done or p not in names for p in items[i][0]["predecessors"])]
+            # Snowflake rejects cycles, so this only guards against a malformed file: keep file order
+            ready = ready or pending
+            result.extend(items[i] for i in ready)
+            done.update(items[i][0]["name"] for i in ready)
+            pending = [i for i in pending if i not in ready]
+        ordered.append(result)
+    return ordered
+
+
+def _task_workers() -> int:
+    """Task graphs applied concurrently in --sync mode (SNOWFLAKE_TASK_WORKERS, default 4)."""
+    return int_env("SNOWFLAKE_TASK_WORKERS", 4, minimum=1)
+
+
+def apply_task_graph(conn, database: str, schema: str, graph: list, current: dict, metrics) -> None:
+    """Apply one graph's changed tasks in order, suspending started root tasks and resuming started tasks after."""
+    names = {t["name"] for t, _ in graph}
+    parsed = {t["name"]: t["predecessors"] for t, _ in graph}
+    # Walk up from every changed task through its new predecessors (from the file) and its old
+    # ones (SHOW TASKS): a new or re-pointed task can hang below a running root that only one side shows
+    roots = set()
+    seen = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        predecessors = set(parsed.get(name, [])) | set(current.get(name, {}).get("predecessors", []))
+        if predecessors:
+            pending.extend(predecessors)
+        else:
+            roots.add(name)
+    started_roots = [r for r in sorted(roots) if current.get(r, {}).get("state") == "started"]
+    # graph is in dependency order, so reversed it resumes children before their predecessors
+    resume = [
+        t["name"] for t, _ in reversed(graph)
+        if current.get(t["name"], {}).get("state") == "started" and t["name"] not in started_roots
+    ]
+    cur = conn.cursor()
+    try:
+        for root in started_roots:
+            cur.execute(f'ALTER TASK "{database}"."{schema}"."{root}" SUSPEND')
+        for task, stmt in graph:
+            with metrics.item(f"{schema}.{task['name']}"):
+                with phase("execute"):
+                    cur.execute(stmt)
+                query_id(cur)
+            metrics.report(f"  Applied task: {schema}.{task['name']}")
+        for name in resume + started_roots:
+            cur.execute(f'ALTER TASK "{database}"."{schema}"."{name}" RESUME')
+    finally:
+        cur.close()
+
+
+def sync_tasks(conn, database: str, schema: str, statements: list, workers=None) -> int:
+    """Apply only missing or changed task statements; returns the number applied."""
+    current = show_tasks(conn, database, schema)
+    changed, unchanged, other = plan_task_sync(statements, current)
+    print(f"Task sync: {len(changed)} to apply, {len(unchanged)} unchanged (skipped)")
+    graphs = task_graphs(changed, current)
+    metrics = RunMetrics("tasks", len(changed))
+    workers = min(workers or _task_workers(), len(graphs))
+    if workers <= 1:
+        for graph in graphs:
+            apply_task_graph(conn, database, schema, graph, current, metrics)
+    else:
+        pool = ConnectionPool(lambda: get_connection()[0], workers)
+
+        def _apply(graph):
+            with pool.connection() as worker_conn:
+                apply_task_graph(worker_conn, database, schema, graph, current, metrics)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(_apply, graph) for graph in graphs]:
+                    future.result()
+        finally:
+            pool.close_all()
+    # Other statements (e.g. ALTER TASK ... RESUME) may refer to any task, so they run last, in order
+    cur = conn.cursor()
+    try:
+        for stmt in other:
+            cur.execute(stmt)
+    finally:
+        cur.close()
+    metrics.summary()
+    return len(changed) + len(other)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Create Snowflake tasks from tasks/tasks.sql or TASK_DEFINITIONS.")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Apply only tasks that are missing or differ from SHOW TASKS; apply independent task graphs concurrently.",
+    )
+    args = parser.parse_args()
     conn, database, schema = get_connection()
     tasks_file = _script_dir / "tasks" / "tasks.sql"
 
+    if args.sync:
+        statements = read_task_blocks(tasks_file)
+        if not statements:
+            warehouse = os.getenv("SNOWFLAKE_WAREHOUSE")
+            if not warehouse:
+                raise SystemExit("SNOWFLAKE_WAREHOUSE is required in .env (or export tasks to tasks/tasks.sql first).")
+            statements = [
+                generate_task_sql(database, schema, warehouse, task_name, schedule, sql)
+                for task_name, schedule, sql in TASK_DEFINITIONS
+            ]
+        try:
+            sync_tasks(conn, database, schema, statements)
+        finally:
+            conn.close()
+        print("Done. New tasks are created SUSPENDED; tasks that were running were resumed.")
+        return
+
     # Prefer duplicated tasks from export (tasks/tasks.sql)
     if run_tasks_sql_file(conn, tasks_file):
         conn.close()
@@ -116,12 +322,17 @@ def main():
     if not warehouse:
         raise SystemExit("SNOWFLAKE_WAREHOUSE is required in .env (or export tasks to tasks/tasks.sql first).")
 
+    metrics = RunMetrics("tasks", len(TASK_DEFINITIONS))
     cur = conn.cursor()
     try:
         for task_name, schedule, sql in TASK_DEFINITIONS:
             create_sql = generate_task_sql(database, schema, warehouse, task_name, schedule, sql)
-            cur.execute(create_sql)
-            print(f"  Created task: {schema}.{task_name} (schedule: {schedule})")
+            with metrics.item(f"{schema}.{task_name}"):
+                with phase("execute"):
+                    cur.execute(create_sql)
+                query_id(cur)
+            metrics.report(f"  Created task: {schema}.{task_name} (schedule: {schedule})")
+        metrics.summary()
         print("Done. Tasks are created SUSPENDED. To run them: ALTER TASK <name> RESUME;")
     finally:
         cur.close()
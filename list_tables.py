@@ -1,37 +1,21 @@
 #!/usr/bin/env python3
 """List and count tables in the SunSpectra database (production, not the lab)."""
 import os
-from pathlib import Path
 
-from dotenv import load_dotenv
-
-_script_dir = Path(__file__).resolve().parent
-load_dotenv(_script_dir / ".env")
+from snowflake_catalog import discover_catalog, tables_by_schema
+from snowflake_connection import connect
 
 # Database to inspect (the real SunSpectra, not the lab). Name in account: SUN_SPECTRA
 SUNSPECTRA_DB = os.getenv("SUNSPECTRA_DATABASE", "SUN_SPECTRA")
 
 
 def main():
-    import snowflake.connector
-    account = os.getenv("SNOWFLAKE_ACCOUNT")
-    user = os.getenv("SNOWFLAKE_USER")
-    password = os.getenv("SNOWFLAKE_PASSWORD")
-    warehouse = os.getenv("SNOWFLAKE_WAREHOUSE")
-    role = os.getenv("SNOWFLAKE_ROLE")
-    if not all([account, user, password, warehouse]):
+    required = ("SNOWFLAKE_ACCOUNT", "SNOWFLAKE_USER", "SNOWFLAKE_PASSWORD", "SNOWFLAKE_WAREHOUSE")
+    if not all(os.getenv(name) for name in required):
         raise SystemExit("Missing SNOWFLAKE_* env vars in .env")
-    if ".snowflakecomputing.com" in (account or ""):
-        account = account.replace(".snowflakecomputing.com", "")
 
     # Connect without default database so we can query any DB
-    conn = snowflake.connector.connect(
-        account=account,
-        user=user,
-        password=password,
-        warehouse=warehouse,
-        role=role,
-    )
+    conn = connect()
     cur = conn.cursor()
 
     # Prefer exact match (e.g. SUN_SPECTRA); else any SunSpectra DB excluding lab
@@ -48,24 +32,16 @@ def main():
         return
 
     database = sunspectra[0]
-    cur.execute(f'USE DATABASE "{database}"')
-    cur.execute("SHOW SCHEMAS IN DATABASE")
-    schemas = [r[1] for r in cur.fetchall() if r[1]]
+    # One INFORMATION_SCHEMA.TABLES query for the whole database (cached for SNOWFLAKE_CATALOG_TTL)
+    schema_tables = tables_by_schema(discover_catalog(conn, database))
 
     total = 0
     print(f"Database: {database}\n")
-    for schema in schemas:
-        try:
-            cur.execute(f'USE SCHEMA "{schema}"')
-            cur.execute("SHOW TABLES")
-            tables = [r[1] for r in cur.fetchall() if r[1]]
-            if tables:
-                total += len(tables)
-                print(f"  {schema}: {len(tables)} table(s)")
-                for t in sorted(tables):
-                    print(f"    - {t}")
-        except Exception as e:
-            print(f"  {schema}: (skip: {e})")
+    for schema, tables in schema_tables.items():
+        total += len(tables)
+        print(f"  {schema}: {len(tables)} table(s)")
+        for t in tables:
+            print(f"    - {t}")
 
     print(f"\nTotal tables in {database}: {total}")
     cur.close()
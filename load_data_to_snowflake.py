@@ -1,53 +1,34 @@
 #!/usr/bin/env python3
 """
-Create schema/tables (from schema/*.sql or inferred from CSV) and load all data/*.csv
-into your Snowflake. Uses only environment variables from .env; no hardcoded credentials.
+Create schema/tables (from schema/*.sql or inferred from the data) and load all data/*.csv
+(or data/*.parquet) into your Snowflake. Uses only environment variables from .env; no hardcoded credentials.
 Does not add Semantic Model Configuration—tables and data only.
 """
-import os
+import argparse
 import csv
+import gzip
+import os
+import json
+import queue
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from pathlib import Path
 
-from dotenv import load_dotenv
+from csv_types import infer_column_types, typed_table_ddl
+from run_metrics import RunMetrics, add, phase, query_id
+from snowflake_connection import ConnectionPool, connect, env_flag, int_env, require_env
+from sql_statements import split_sql_statements, strip_comments, table_columns
 
 _script_dir = Path(__file__).resolve().parent
-load_dotenv(_script_dir / ".env")
-load_dotenv(_script_dir.parent / ".env")
 
 
 def get_connection():
     """Connect to Snowflake using env vars only. Use a PAT as SNOWFLAKE_PASSWORD (not your account password)."""
-    account = os.getenv("SNOWFLAKE_ACCOUNT")
-    user = os.getenv("SNOWFLAKE_USER")
-    password = os.getenv("SNOWFLAKE_PASSWORD")
-    warehouse = os.getenv("SNOWFLAKE_WAREHOUSE")
-    database = os.getenv("SNOWFLAKE_DATABASE")
-    schema = os.getenv("SNOWFLAKE_SCHEMA")
-    role = os.getenv("SNOWFLAKE_ROLE")
-    for name, val in [
-        ("SNOWFLAKE_ACCOUNT", account),
-        ("SNOWFLAKE_USER", user),
-        ("SNOWFLAKE_PASSWORD", password),
-        ("SNOWFLAKE_WAREHOUSE", warehouse),
-        ("SNOWFLAKE_DATABASE", database),
-        ("SNOWFLAKE_SCHEMA", schema),
-    ]:
-        if not val:
-            raise SystemExit(f"Missing required env: {name}. Set in .env.")
-    if account and ".snowflakecomputing.com" in account:
-        account = account.replace(".snowflakecomputing.com", "")
-
-    import snowflake.connector
-    conn = snowflake.connector.connect(
-        account=account,
-        user=user,
-        password=password,
-        warehouse=warehouse,
-        role=role,
-        database=database,
-        schema=schema,
-    )
-    return conn, database, schema
+    database, schema = require_env("SNOWFLAKE_DATABASE", "SNOWFLAKE_SCHEMA")
+    return connect(database, schema), database, schema
 
 
 def ensure_schema(conn, database, schema):
@@ -62,34 +43,274 @@ def ensure_schema(conn, database, schema):
         cur.close()
 
 
-def run_ddl_file(conn, ddl_path, database, schema):
-    """Run a single DDL file. Replaces database/schema placeholders if present."""
+def read_ddl_statements(ddl_path, database, schema):
+    """Statements of a DDL file, split with quotes/comments respected, placeholders substituted."""
     sql = ddl_path.read_text(encoding="utf-8")
     # Optional: substitute placeholders for user's database/schema
     sql = sql.replace("${database}", f'"{database}"').replace("${schema}", f'"{schema}"')
-    for stmt in sql.split(";"):
-        stmt = stmt.strip()
-        if stmt and not stmt.startswith("--"):
-            conn.cursor().execute(stmt)
-
-
-def create_table_from_csv(conn, database, schema, table_name, csv_path):
-    """Create a table from CSV header (all columns VARCHAR) if table does not exist."""
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader)
-    cols = ", ".join(f'"{c}" VARCHAR' for c in header)
+    return split_sql_statements(sql)
+
+
+def run_ddl_file(conn, ddl_path, database, schema):
+    """Run a single DDL file on one cursor. Replaces database/schema placeholders if present."""
     cur = conn.cursor()
     try:
-        cur.execute(f'CREATE TABLE IF NOT EXISTS "{database}"."{schema}"."{table_name}" ({cols})')
+        for stmt in read_ddl_statements(ddl_path, database, schema):
+            with phase("ddl"):
+                cur.execute(stmt)
+            query_id(cur)
     finally:
         cur.close()
 
 
-def load_csv_into_table(conn, database, schema, table_name, csv_path):
-    """Load a CSV file into the given table using write_pandas or INSERT."""
-    import pandas as pd
-    df = pd.read_csv(csv_path)
+_CREATE_OR_REPLACE_RE = re.compile(r"^create\s+or\s+replace\s", re.IGNORECASE)
+
+
+def existing_tables(conn, database, schema):
+    """Names of the tables already in database.schema, from one INFORMATION_SCHEMA query."""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f'SELECT TABLE_NAME FROM "{database}".INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = %s',
+            [schema],
+        )
+        return {row[0] for row in cur.fetchall()}
+    finally:
+        cur.close()
+
+
+# DDL type names -> the DATA_TYPE INFORMATION_SCHEMA.COLUMNS reports for them
+_DATA_TYPES = {
+    "NUMBER": ("NUMBER", "DECIMAL", "NUMERIC", "INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "BYTEINT"),
+    "FLOAT": ("FLOAT", "FLOAT4", "FLOAT8", "DOUBLE", "REAL"),
+    "TEXT": ("VARCHAR", "STRING", "TEXT", "CHAR", "CHARACTER", "NCHAR", "NVARCHAR", "NVARCHAR2"),
+    "BINARY": ("BINARY", "VARBINARY"),
+    "TIMESTAMP_NTZ": ("TIMESTAMP_NTZ", "TIMESTAMPNTZ", "TIMESTAMP", "DATETIME"),
+    "TIMESTAMP_LTZ": ("TIMESTAMP_LTZ", "TIMESTAMPLTZ"),
+    "TIMESTAMP_TZ": ("TIMESTAMP_TZ", "TIMESTAMPTZ"),
+}
+_DATA_TYPE_OF = {name: data_type for data_type, names in _DATA_TYPES.items() for name in names}
+
+
+def _ddl_column_type(sf_type):
+    """(DATA_TYPE, size) of a DDL column type: NUMBER(p,s) and TEXT(length) keep their size."""
+    name = re.match(r"[A-Za-z_]\w*", sf_type).group(0).upper()
+    args = tuple(int(arg) for arg in re.findall(r"\d+", sf_type[len(name):]))
+    data_type = _DATA_TYPE_OF.get(name, name)
+    if data_type == "NUMBER":
+        return data_type, (args + (38, 0)[len(args):] if name in ("NUMBER", "DECIMAL", "NUMERIC") else (38, 0))
+    if data_type == "TEXT":
+        return data_type, args or ((1,) if name in ("CHAR", "CHARACTER", "NCHAR") else (16777216,))
+    return data_type, ()
+
+
+def existing_columns(conn, database, schema):
+    """{table: [(column, (DATA_TYPE, size)), ...]} for database.schema, from one INFORMATION_SCHEMA query."""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE "
+            f'FROM "{database}".INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = %s '
+            "ORDER BY TABLE_NAME, ORDINAL_POSITION",
+            [schema],
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    columns = {}
+    for table_name, column, data_type, length, precision, scale in rows:
+        if data_type == "NUMBER":
+            size = (precision, scale)
+        elif data_type == "TEXT":
+            size = (length,)
+        else:
+            size = ()
+        columns.setdefault(table_name, []).append((column, (data_type, size)))
+    return columns
+
+
+def _batch_ddl():
+    """Whether to plan and batch each schema's DDL (SNOWFLAKE_LOAD_BATCH_DDL, default on)."""
+    return env_flag("SNOWFLAKE_LOAD_BATCH_DDL", True)
+
+
+def plan_schema_ddl(conn, database, schema, tables):
+    """Prepare a schema's tables with one multi-statement DDL batch; returns the tables that are ready."""
+    existing = existing_tables(conn, database, schema)
+    columns = None
+    statements = []
+    ready = set()
+    for table_name, ddl_path in tables:
+        ddl = read_ddl_statements(ddl_path, database, schema) if ddl_path is not None and ddl_path.exists() else None
+        if table_name in existing:
+            replace = [stmt for stmt in ddl or [] if _CREATE_OR_REPLACE_RE.match(strip_comments(stmt))]
+            if replace:
+                if columns is None:
+                    columns = existing_columns(conn, database, schema)
+                wanted = [
+                    (name, _ddl_column_type(sf_type)) for stmt in replace for name, sf_type in table_columns(stmt)
+                ]
+                if wanted and wanted == columns.get(table_name):
+                    statements.append(f'TRUNCATE TABLE "{database}"."{schema}"."{table_name}"')
+                else:
+                    statements.extend(ddl)
+            ready.add(table_name)
+        elif ddl:
+            statements.extend(ddl)
+            ready.add(table_name)
+    if not statements:
+        return ready
+    cur = conn.cursor()
+    try:
+        # The separator gets its own line: a statement may end in a -- comment (see clean_ddl)
+        cur.execute("\n;\n".join(statements), num_statements=len(statements))
+    except Exception as e:
+        print(f"  Batched DDL for {schema} failed ({e}); running DDL per table", flush=True)
+        return set()
+    finally:
+        cur.close()
+    return ready
+
+
+def _infer_types():
+    return env_flag("SNOWFLAKE_LOAD_INFER_TYPES", True)
+
+
+def create_table_from_csv(conn, database, schema, table_name, csv_path, ddl_cache_path=None, csv_paths=None):
+    """Create a table from CSV data if table does not exist, with column types inferred from the data."""
+    if _infer_types():
+        with phase("infer"):
+            column_types = infer_column_types(
+                csv_paths or [csv_path], sample_rows=int_env("SNOWFLAKE_LOAD_INFER_SAMPLE_ROWS", 0)
+            )
+        ddl = typed_table_ddl(table_name, column_types)
+        if ddl_cache_path is not None:
+            ddl_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            ddl_cache_path.write_text(ddl, encoding="utf-8")
+            run_ddl_file(conn, ddl_cache_path, database, schema)
+            return
+        cols = ", ".join(f'"{name}" {sf_type}' for name, sf_type in column_types)
+    else:
+        cols = ", ".join(f'"{c}" VARCHAR' for c in _csv_header(csv_path))
+    cur = conn.cursor()
+    try:
+        with phase("ddl"):
+            cur.execute(f'CREATE TABLE IF NOT EXISTS "{database}"."{schema}"."{table_name}" ({cols})')
+        query_id(cur)
+    finally:
+        cur.close()
+
+
+def _csv_header(csv_path):
+    """Column names from the first row of a CSV (or .csv.gz) file."""
+    opener = gzip.open if csv_path.suffix == ".gz" else open
+    with opener(csv_path, "rt", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f))
+
+
+def snowflake_type(arrow_type):
+    """Map an Arrow column type (from a Parquet export) to a Snowflake column type."""
+    import pyarrow.types as pat
+    if pat.is_integer(arrow_type):
+        return "NUMBER(38,0)"
+    if pat.is_decimal(arrow_type):
+        return f"NUMBER({arrow_type.precision},{arrow_type.scale})"
+    if pat.is_floating(arrow_type):
+        return "FLOAT"
+    if pat.is_boolean(arrow_type):
+        return "BOOLEAN"
+    if pat.is_date(arrow_type):
+        return "DATE"
+    if pat.is_timestamp(arrow_type):
+        return "TIMESTAMP_TZ" if arrow_type.tz else "TIMESTAMP_NTZ"
+    if pat.is_time(arrow_type):
+        return "TIME"
+    if pat.is_binary(arrow_type) or pat.is_large_binary(arrow_type):
+        return "BINARY"
+    return "VARCHAR"
+
+
+def _arrow_type(sf_type):
+    """Map a Snowflake column type from a table's DDL to the Arrow type its CSV column is parsed as."""
+    import pyarrow as pa
+    base, _, args = sf_type.upper().partition("(")
+    base = base.strip()
+    numbers = [int(n) for n in re.findall(r"\d+", args)]
+    if base in ("NUMBER", "DECIMAL", "NUMERIC", "INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "BYTEINT"):
+        precision = numbers[0] if numbers else 38
+        scale = numbers[1] if len(numbers) > 1 else 0
+        return pa.int64() if scale == 0 and precision <= 18 else pa.decimal128(precision, scale)
+    if base in ("FLOAT", "FLOAT4", "FLOAT8", "DOUBLE", "REAL"):
+        return pa.float64()
+    if base == "BOOLEAN":
+        return pa.bool_()
+    if base == "DATE":
+        return pa.date32()
+    if base in ("TIMESTAMP_NTZ", "TIMESTAMP", "DATETIME"):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def create_table_from_parquet(conn, database, schema, table_name, parquet_path):
+    """Create a table from a Parquet file's column names and types if table does not exist."""
+    import pyarrow.parquet as pq
+    arrow_schema = pq.read_schema(parquet_path)
+    cols = ", ".join(f'"{field.name}" {snowflake_type(field.type)}' for field in arrow_schema)
+    cur = conn.cursor()
+    try:
+        with phase("ddl"):
+            cur.execute(f'CREATE TABLE IF NOT EXISTS "{database}"."{schema}"."{table_name}" ({cols})')
+        query_id(cur)
+    finally:
+        cur.close()
+
+
+def _load_chunk_rows():
+    """CSV rows read and uploaded per chunk (SNOWFLAKE_LOAD_CHUNK_ROWS, default 100000)."""
+    return int_env("SNOWFLAKE_LOAD_CHUNK_ROWS", 100000, minimum=1)
+
+
+def prefetch(iterator, depth=1):
+    """Yield items from iterator while a background thread reads up to depth items ahead."""
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for item in iterator:
+                if not _put((item, None)):
+                    return
+            _put((done, None))
+        except Exception as e:
+            _put((done, e))
+
+    reader = threading.Thread(target=_produce, daemon=True)
+    reader.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        reader.join()
+
+
+def load_dataframe(conn, database, schema, table_name, df):
+    """Append one DataFrame to the table with write_pandas, falling back to batched INSERT."""
     df.columns = [c.upper() for c in df.columns]
     if df.empty:
         return 0
@@ -106,71 +327,485 @@ def load_csv_into_table(conn, database, schema, table_name, csv_path):
         )
         return nrows if success else 0
     except Exception:
-        # Fallback: INSERT row by row
-        cur = conn.cursor()
-        cols = ", ".join(f'"{c}"' for c in df.columns)
-        placeholders = ", ".join(["%s"] * len(df.columns))
-        insert_sql = f'INSERT INTO "{schema}"."{table_name}" ({cols}) VALUES ({placeholders})'
-        for _, row in df.iterrows():
-            cur.execute(insert_sql, tuple(row))
+        # Fallback: batched multi-row INSERT
+        add(retries=1)
+        return insert_dataframe(conn, database, schema, table_name, df)
+
+
+def load_csv_into_table(conn, database, schema, table_name, csv_path, chunk_rows=None):
+    """Load a CSV file into the given table in chunks using write_pandas or INSERT; returns the rows loaded."""
+    import pandas as pd
+    # Closing the prefetch generator stops its reader thread when an upload fails
+    with pd.read_csv(csv_path, chunksize=chunk_rows or _load_chunk_rows()) as chunks:
+        with closing(prefetch(chunks)) as frames:
+            return _upload_chunks(conn, database, schema, table_name, frames)
+
+
+def _upload_chunks(conn, database, schema, table_name, frames):
+    """Append each DataFrame from frames; "read" times waiting on the reader, "upload" the upload."""
+    total = 0
+    while True:
+        with phase("read"):
+            df = next(frames, None)
+        if df is None:
+            return total
+        with phase("upload"):
+            total += load_dataframe(conn, database, schema, table_name, df)
+
+
+def ddl_arrow_types(ddl_path, database, schema):
+    """{COLUMN: Arrow type} for the columns created by a DDL file (see _arrow_type)."""
+    types = {}
+    for stmt in read_ddl_statements(ddl_path, database, schema):
+        for name, sf_type in table_columns(stmt):
+            types[name.upper()] = _arrow_type(sf_type)
+    return types
+
+
+def csv_to_parquet(csv_path, out_path, column_types, stream=False):
+    """Parse a CSV with PyArrow's multithreaded reader and write it to out_path as Parquet; returns the rows written."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=16 * 1024 * 1024)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: column_types.get(name.upper(), pa.string()) for name in _csv_header(csv_path)},
+        strings_can_be_null=True,
+    )
+    source = pa.memory_map(str(csv_path)) if csv_path.suffix == ".csv" else pa.input_stream(str(csv_path))
+    with source:
+        if not stream:
+            table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+            pq.write_table(table, out_path)
+            return table.num_rows
+        reader = pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options)
+        rows = 0
+        with pq.ParquetWriter(out_path, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+
+def load_csv_arrow(conn, database, schema, table_name, parts, ddl_path=None):
+    """Load CSV parts through PyArrow and COPY INTO; returns (rows_loaded, errors) like copy_into_table."""
+    column_types = {}
+    if ddl_path is not None and ddl_path.exists():
+        column_types = ddl_arrow_types(ddl_path, database, schema)
+    split_bytes = int_env("SNOWFLAKE_LOAD_SPLIT_BYTES", 100 * 1024 * 1024)
+    with tempfile.TemporaryDirectory(prefix="sunspectra_arrow_") as tmp:
+        files = []
+        for part in parts:
+            if part.suffix == ".parquet":
+                files.append(part)
+                continue
+            out_path = Path(tmp) / f"{part.name.split('.')[0]}_{len(files):04d}.parquet"
+            with phase("parse"):
+                csv_to_parquet(part, out_path, column_types, stream=part.stat().st_size > split_bytes)
+            files.append(out_path)
+        return copy_into_table(conn, database, schema, table_name, files)
+
+
+def _insert_batch_size():
+    """Rows per INSERT in the write_pandas fallback (SNOWFLAKE_LOAD_INSERT_BATCH_SIZE, default 10000)."""
+    # Snowflake accepts at most 16384 rows in one INSERT ... VALUES statement
+    return min(int_env("SNOWFLAKE_LOAD_INSERT_BATCH_SIZE", 10000, minimum=1), 16384)
+
+
+def insert_dataframe(conn, database, schema, table_name, df, batch_size=None):
+    """INSERT a DataFrame in chunks with executemany (one multi-row VALUES round trip per chunk)."""
+    batch_size = batch_size or _insert_batch_size()
+    cols = ", ".join(f'"{c}"' for c in df.columns)
+    placeholders = ", ".join(["%s"] * len(df.columns))
+    insert_sql = f'INSERT INTO "{database}"."{schema}"."{table_name}" ({cols}) VALUES ({placeholders})'
+    values = df.astype(object).where(df.notna(), None)
+    n_chunks = (len(values) + batch_size - 1) // batch_size
+    cur = conn.cursor()
+    try:
+        for chunk_no, start in enumerate(range(0, len(values), batch_size), 1):
+            rows = values.iloc[start:start + batch_size].to_numpy().tolist()
+            try:
+                cur.executemany(insert_sql, rows)
+                query_id(cur)
+            except Exception as e:
+                raise RuntimeError(
+                    f"INSERT into {schema}.{table_name} failed on chunk {chunk_no}/{n_chunks} "
+                    f"(rows {start + 1}-{start + len(rows)}): {e}"
+                ) from e
+    finally:
+        cur.close()
+    return len(values)
+
+
+def table_data_files(directory):
+    """Return the data path per table in directory: TABLE/ over TABLE.parquet over TABLE.csv."""
+    files = {}
+    for path in sorted(directory.glob("*.csv")) + sorted(directory.glob("*.parquet")):
+        files[path.stem] = path
+    for path in sorted(p for p in directory.iterdir() if p.is_dir()):
+        files[path.name] = path
+    return [files[name] for name in sorted(files)]
+
+
+def table_parts(data_path):
+    """The files holding a table's data: the file itself, or the part files of a TABLE/ directory."""
+    if not data_path.is_dir():
+        return [data_path]
+    return sorted(
+        p for p in data_path.iterdir()
+        if p.is_file() and (p.suffix in (".csv", ".parquet") or p.name.endswith(".csv.gz"))
+    )
+
+
+def truncate_table(conn, database, schema, table_name):
+    """Remove all rows from a table (used to reload a table a failed run left half-loaded)."""
+    cur = conn.cursor()
+    try:
+        cur.execute(f'TRUNCATE TABLE IF EXISTS "{database}"."{schema}"."{table_name}"')
+    finally:
+        cur.close()
+
+
+def load_table(conn, database, schema, table_name, data_path, ddl_path=None, truncate=False, create=True):
+    """Create one table (from its DDL file, or inferred from the data) and load its data; returns (rows, detail)."""
+    parts = table_parts(data_path)
+    if create:
+        if ddl_path is not None and ddl_path.exists():
+            run_ddl_file(conn, ddl_path, database, schema)
+        elif not parts:
+            # Empty unload directory and no DDL: nothing to infer columns from
+            return 0, ""
+        elif parts[0].suffix == ".parquet":
+            create_table_from_parquet(conn, database, schema, table_name, parts[0])
+        else:
+            create_table_from_csv(
+                conn, database, schema, table_name, parts[0], ddl_cache_path=ddl_path, csv_paths=parts
+            )
+    if truncate:
+        truncate_table(conn, database, schema, table_name)
+    # Parquet is always loaded by the warehouse, by column name: a pandas round trip loses timestamp types
+    if parts and (_load_method() == "copy" or parts[0].suffix == ".parquet"):
+        rows, errors = copy_into_table(conn, database, schema, table_name, parts)
+        return rows, f" (COPY, ON_ERROR={_on_error()}, {errors} errors)"
+    if parts and _load_method() == "arrow":
+        rows, errors = load_csv_arrow(conn, database, schema, table_name, parts, ddl_path)
+        return rows, f" (Arrow + COPY, ON_ERROR={_on_error()}, {errors} errors)"
+    total = 0
+    for part in parts:
+        total += load_csv_into_table(conn, database, schema, table_name, part)
+    return total, ""
+
+
+def _load_method():
+    """How table data is uploaded (SNOWFLAKE_LOAD_METHOD: pandas, copy or arrow, default pandas)."""
+    method = os.getenv("SNOWFLAKE_LOAD_METHOD", "pandas").strip().lower()
+    if method not in ("pandas", "copy", "arrow"):
+        raise SystemExit(f"Unsupported SNOWFLAKE_LOAD_METHOD: {method} (use pandas, copy or arrow).")
+    return method
+
+
+def _on_error():
+    """COPY INTO ON_ERROR option (SNOWFLAKE_LOAD_ON_ERROR, default ABORT_STATEMENT)."""
+    on_error = os.getenv("SNOWFLAKE_LOAD_ON_ERROR", "ABORT_STATEMENT").strip().upper()
+    # 'SKIP_FILE_10%' must be quoted; the other forms are keywords
+    return f"'{on_error}'" if on_error.endswith("%") else on_error
+
+
+def split_csv_file(csv_path, out_dir, max_bytes):
+    """Split a CSV into gzip chunks of about max_bytes, each with the header row; returns the chunk paths."""
+    chunks = []
+    out = None
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        header = f.readline()
+        written = 0
+        quotes = 0
+        for line in f:
+            if out is None:
+                chunk_path = out_dir / f"{csv_path.stem}_{len(chunks):04d}.csv.gz"
+                out = gzip.open(chunk_path, "wt", encoding="utf-8", newline="", compresslevel=1)
+                out.write(header)
+                chunks.append(chunk_path)
+                written = 0
+            out.write(line)
+            written += len(line)
+            quotes += line.count('"')
+            if quotes % 2 == 0 and written >= max_bytes:
+                out.close()
+                out = None
+    if out is not None:
+        out.close()
+    return chunks
+
+
+def copy_into_table(conn, database, schema, table_name, parts):
+    """Bulk-load files with PUT to the table stage and one COPY INTO; returns (rows_loaded, errors)."""
+    split_bytes = int_env("SNOWFLAKE_LOAD_SPLIT_BYTES", 100 * 1024 * 1024)
+    parallel = min(int_env("SNOWFLAKE_LOAD_PUT_PARALLEL", 8, minimum=1), 99)
+    parquet = parts[0].suffix == ".parquet"
+    stage = f'@"{database}"."{schema}".%"{table_name}"'
+    if parquet:
+        file_format = "TYPE = PARQUET"
+        match = " MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE"
+    else:
+        file_format = (
+            "TYPE = CSV SKIP_HEADER = 1 FIELD_OPTIONALLY_ENCLOSED_BY = '\"' "
+            "EMPTY_FIELD_AS_NULL = TRUE COMPRESSION = AUTO"
+        )
+        match = ""
+    cur = conn.cursor()
+    try:
+        cur.execute(f"REMOVE {stage}")
+        with tempfile.TemporaryDirectory(prefix="sunspectra_load_") as tmp:
+            upload = []
+            for part in parts:
+                if not parquet and part.suffix == ".csv" and part.stat().st_size > split_bytes:
+                    with phase("split"):
+                        split_csv_file(part, Path(tmp), split_bytes)
+                else:
+                    upload.append(part.resolve().as_posix())
+            if any(Path(tmp).iterdir()):
+                # One PUT uploads all split chunks in parallel
+                upload.append(f"{Path(tmp).resolve().as_posix()}/*")
+            for pattern in upload:
+                with phase("put"):
+                    cur.execute(
+                        f"PUT 'file://{pattern}' {stage} "
+                        f"PARALLEL = {parallel} AUTO_COMPRESS = TRUE OVERWRITE = TRUE"
+                    )
+                query_id(cur)
+        return copy_from_stage(cur, database, schema, table_name, stage, file_format, match)
+    finally:
         cur.close()
-        return len(df)
+
+
+def copy_from_stage(cur, database, schema, table_name, stage, file_format, match=""):
+    """COPY INTO the table from the files in stage (purging them); returns (rows_loaded, errors)."""
+    with phase("copy"):
+        cur.execute(
+            f'COPY INTO "{database}"."{schema}"."{table_name}" FROM {stage} '
+            f"FILE_FORMAT = ({file_format}){match} ON_ERROR = {_on_error()} PURGE = TRUE"
+        )
+    query_id(cur)
+    columns = [d[0].lower() for d in cur.description]
+    rows = cur.fetchall()
+    if "rows_loaded" not in columns:
+        # e.g. "Copy executed with 0 files processed."
+        return 0, 0
+    loaded_idx = columns.index("rows_loaded")
+    errors_idx = columns.index("errors_seen")
+    return sum(row[loaded_idx] or 0 for row in rows), sum(row[errors_idx] or 0 for row in rows)
+
+
+def _load_workers():
+    """Number of tables loaded concurrently (SNOWFLAKE_LOAD_WORKERS, default 4)."""
+    return int_env("SNOWFLAKE_LOAD_WORKERS", 4, minimum=1)
+
+
+_checkpoint_lock = threading.Lock()
+
+
+def read_checkpoint(checkpoint_path, database):
+    """Read the load checkpoint; returns an empty one if missing or for another database."""
+    if checkpoint_path.exists():
+        checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+        if checkpoint.get("database") == database:
+            return checkpoint
+    return {"database": database, "tables": {}}
+
+
+def mark_checkpoint(checkpoint_path, checkpoint, key, status):
+    """Record a table's status (in_progress, done, failed) and rewrite the checkpoint atomically."""
+    with _checkpoint_lock:
+        checkpoint["tables"][key] = status
+        tmp_path = checkpoint_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(checkpoint, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        tmp_path.replace(checkpoint_path)
+
+
+def load_tables(conn, database, schema_groups, workers=None, checkpoint_path=None, resume=False):
+    """Load [(schema, [(table, data_path, ddl_path, label), ...]), ...]; returns (loaded, failures)."""
+    workers = workers or _load_workers()
+    metrics = RunMetrics("load", sum(len(items) for _, items in schema_groups))
+    loaded = 0
+    failures = []
+    checkpoint = None
+    if checkpoint_path is not None:
+        checkpoint = read_checkpoint(checkpoint_path, database) if resume else {"database": database, "tables": {}}
+    previous = dict(checkpoint["tables"]) if checkpoint is not None else {}
+
+    def _load_measured(table_conn, schema, table_name, data_path, ddl_path, truncate):
+        with metrics.item(f"{schema}.{table_name}", file=data_path.name):
+            if truncate:
+                add(resumed=1)
+            rows, detail = load_table(
+                table_conn, database, schema, table_name, data_path, ddl_path,
+                truncate=truncate, create=(schema, table_name) not in prepared,
+            )
+            add(rows=rows, bytes=sum(part.stat().st_size for part in table_parts(data_path)))
+        return rows, detail
+
+    def _load(table_conn, schema, table_name, data_path, ddl_path):
+        if checkpoint is None:
+            return _load_measured(table_conn, schema, table_name, data_path, ddl_path, False)
+        key = f"{schema}.{table_name}"
+        truncate = previous.get(key) in ("in_progress", "failed")
+        mark_checkpoint(checkpoint_path, checkpoint, key, "in_progress")
+        try:
+            result = _load_measured(table_conn, schema, table_name, data_path, ddl_path, truncate)
+        except BaseException:
+            mark_checkpoint(checkpoint_path, checkpoint, key, "failed")
+            raise
+        mark_checkpoint(checkpoint_path, checkpoint, key, "done")
+        return result
+
+    def _report(label, load):
+        nonlocal loaded
+        if load is None:
+            metrics.report(f"  {label}: already loaded (checkpoint), skipped")
+            return
+        try:
+            n, detail = load()
+        except Exception as e:
+            failures.append((label, e))
+            metrics.report(f"  {label}: FAILED ({e})")
+            return
+        loaded += 1
+        metrics.report(f"  {label}: {n} rows loaded{detail}")
+
+    def _completed(schema, table_name):
+        return previous.get(f"{schema}.{table_name}") == "done"
+
+    # (schema, table) pairs whose DDL plan_schema_ddl already applied
+    prepared = set()
+
+    def _prepare_schema(schema, items):
+        ensure_schema(conn, database, schema)
+        if _batch_ddl():
+            pending = [
+                (table_name, ddl_path) for table_name, _, ddl_path, _ in items if not _completed(schema, table_name)
+            ]
+            prepared.update((schema, table_name) for table_name in plan_schema_ddl(conn, database, schema, pending))
+
+    if workers <= 1:
+        for schema, items in schema_groups:
+            _prepare_schema(schema, items)
+            for table_name, data_path, ddl_path, label in items:
+                if _completed(schema, table_name):
+                    _report(label, None)
+                    continue
+                _report(label, lambda: _load(conn, schema, table_name, data_path, ddl_path))
+        metrics.summary()
+        return loaded, failures
+
+    pool = ConnectionPool(lambda: get_connection()[0], workers)
+    # Current schema per pooled connection; DDL files from GET_DDL use unqualified table names
+    session_schema = {}
+
+    def _load_one(schema, table_name, data_path, ddl_path):
+        with pool.connection() as worker_conn:
+            if session_schema.get(id(worker_conn)) != schema:
+                cur = worker_conn.cursor()
+                try:
+                    cur.execute(f'USE SCHEMA "{database}"."{schema}"')
+                finally:
+                    cur.close()
+                session_schema[id(worker_conn)] = schema
+            return _load(worker_conn, schema, table_name, data_path, ddl_path)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = []
+    try:
+        for schema, items in schema_groups:
+            _prepare_schema(schema, items)
+            for table_name, data_path, ddl_path, label in items:
+                if _completed(schema, table_name):
+                    futures.append((label, None))
+                    continue
+                futures.append((label, executor.submit(_load_one, schema, table_name, data_path, ddl_path)))
+        for label, future in futures:
+            _report(label, future.result if future is not None else None)
+    finally:
+        for _, future in futures:
+            if future is not None:
+                future.cancel()
+        executor.shutdown(wait=True)
+        pool.close_all()
+    metrics.summary()
+    return loaded, failures
+
+
+def _report_failures(failures):
+    """Print the tables that failed to load and exit non-zero if there were any."""
+    if not failures:
+        return
+    print(f"{len(failures)} table(s) failed to load:")
+    for label, error in failures:
+        print(f"  {label}: {error}")
+    raise SystemExit(1)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Load data/ (CSV or Parquet) into your Snowflake.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip tables a previous run completed (per data/.load_checkpoint.json); "
+        "truncate and reload the table it left in progress.",
+    )
+    args = parser.parse_args()
+    _load_method()  # validate SNOWFLAKE_LOAD_METHOD before connecting
+
     data_dir = _script_dir / "data"
     schema_dir = _script_dir / "schema"
     if not data_dir.exists():
         raise SystemExit("No data/ directory found. Run export_snowflake_to_csv.py first.")
+    checkpoint_path = data_dir / ".load_checkpoint.json"
 
     conn, database, default_schema = get_connection()
 
-    # Multi-schema: data/SCHEMA_NAME/*.csv → create each schema and load its tables (509 tables)
+    # Multi-schema: data/SCHEMA_NAME/*.csv (or *.parquet, or TABLE/ part files) → create each schema and load its tables
     schema_dirs = sorted(d for d in data_dir.iterdir() if d.is_dir())
     if not schema_dirs:
-        csv_files_flat = sorted(data_dir.glob("*.csv"))
-        if not csv_files_flat:
+        data_files_flat = table_data_files(data_dir)
+        if not data_files_flat:
             raise SystemExit(
                 "No data in data/. Export first: set SNOWFLAKE_EXPORT_ALL_SCHEMAS=1 in .env, "
                 "then run python export_snowflake_to_csv.py. See data/README.md and SCHEMAS_REFERENCE.md."
             )
     if schema_dirs:
-        total_tables = 0
+        schema_groups = []
         for schema_path in schema_dirs:
             schema_name = schema_path.name
-            csv_files = sorted(schema_path.glob("*.csv"))
-            if not csv_files:
-                continue
-            ensure_schema(conn, database, schema_name)
-            for csv_path in csv_files:
-                table_name = csv_path.stem
+            items = []
+            for data_path in table_data_files(schema_path):
+                table_name = data_path.stem
                 ddl_path = schema_dir / schema_name / f"{table_name}.sql"
-                if not ddl_path.exists():
+                if not ddl_path.exists() and (schema_dir / f"{table_name}.sql").exists():
                     ddl_path = schema_dir / f"{table_name}.sql"
-                if ddl_path.exists():
-                    run_ddl_file(conn, ddl_path, database, schema_name)
-                else:
-                    create_table_from_csv(conn, database, schema_name, table_name, csv_path)
-                n = load_csv_into_table(conn, database, schema_name, table_name, csv_path)
-                print(f"  {schema_name}.{table_name}: {n} rows loaded")
-                total_tables += 1
+                items.append((table_name, data_path, ddl_path, f"{schema_name}.{table_name}"))
+            if items:
+                schema_groups.append((schema_name, items))
+        try:
+            total_tables, failures = load_tables(
+                conn, database, schema_groups, checkpoint_path=checkpoint_path, resume=args.resume
+            )
+        finally:
+            conn.close()
         print(f"Done. Loaded {total_tables} tables across {len(schema_dirs)} schemas.")
     else:
         # Flat data/*.csv (legacy): use SNOWFLAKE_SCHEMA from .env
-        ensure_schema(conn, database, default_schema)
-        csv_files = sorted(data_dir.glob("*.csv"))
-        for csv_path in csv_files:
-            table_name = csv_path.stem
-            ddl_path = schema_dir / f"{table_name}.sql"
-            if ddl_path.exists():
-                run_ddl_file(conn, ddl_path, database, default_schema)
-            else:
-                create_table_from_csv(conn, database, default_schema, table_name, csv_path)
-            n = load_csv_into_table(conn, database, default_schema, table_name, csv_path)
-            print(f"  {table_name}: {n} rows loaded")
+        items = [
+            (data_path.stem, data_path, schema_dir / f"{data_path.stem}.sql", data_path.stem)
+            for data_path in data_files_flat
+        ]
+        try:
+            _, failures = load_tables(
+                conn, database, [(default_schema, items)], checkpoint_path=checkpoint_path, resume=args.resume
+            )
+        finally:
+            conn.close()
         print("Done.")
-
-    conn.close()
+    _report_failures(failures)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Per-table run metrics for the export, load and task scripts.
+
+RunMetrics.item(key) wraps the work for one table (or task). Code running inside it on
+the same thread records phase timings with `with phase("fetch"):`, counters with
+add(rows=..., bytes=..., retries=...) and query IDs with query_id(cur); outside an item
+these helpers do nothing, so the export/load functions stay usable on their own. Worker
+threads of one item join it with `with attach(current_record()):` taken on the item's thread.
+
+Each finished item is appended as one JSON line to metrics/<run>_<timestamp>.jsonl
+(directory from SNOWFLAKE_METRICS_DIR; set it to 0 to disable). A progress bar with an
+ETA is drawn on stderr when it is a terminal, and summary() prints the slowest items
+and overall throughput.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+_script_dir = Path(__file__).resolve().parent
+_current = threading.local()
+# Guards counter and phase updates of records shared with worker threads (attach)
+_update_lock = threading.Lock()
+
+
+def _record():
+    return getattr(_current, "record", None)
+
+
+def current_record():
+    """The record of the item running on this thread, or None outside an item."""
+    return _record()
+
+
+@contextmanager
+def attach(record):
+    """Attach phase()/add()/query_id() calls on this thread to `record` (None: to nothing)."""
+    previous = _record()
+    _current.record = record
+    try:
+        yield
+    finally:
+        _current.record = previous
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to the current item's phase `name`."""
+    record = _record()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _update_lock:
+            phases = record["phases"]
+            phases[name] = round(phases.get(name, 0.0) + elapsed, 6)
+
+
+def add(**counters):
+    """Add to the current item's counters (rows, bytes, retries, ...)."""
+    record = _record()
+    if record is not None:
+        with _update_lock:
+            for name, value in counters.items():
+                record[name] = record.get(name, 0) + (value or 0)
+
+
+def query_id(cur):
+    """Record the Snowflake query ID of the cursor's last statement on the current item."""
+    record = _record()
+    qid = getattr(cur, "sfqid", None)
+    if record is not None and qid:
+        record["query_ids"].append(qid)
+
+
+def _metrics_path(run):
+    metrics_dir = os.getenv("SNOWFLAKE_METRICS_DIR", "metrics").strip()
+    if metrics_dir.lower() in ("", "0", "false", "no"):
+        return None
+    path = Path(metrics_dir)
+    if not path.is_absolute():
+        path = _script_dir / path
+    return path / f"{run}_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+
+
+def _duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class RunMetrics:
+    """Collects per-item records for one run of `total` items (thread-safe)."""
+
+    def __init__(self, run, total):
+        self.run = run
+        self.total = total
+        self.records = []
+        self.done = 0
+        self.started = time.perf_counter()
+        self.path = _metrics_path(run)
+        self._lock = threading.Lock()
+        self._bar = sys.stderr.isatty()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def item(self, key, **fields):
+        """Time one table/task; nested phase()/add()/query_id() calls on this thread attach to it."""
+        record = {
+            "run": self.run,
+            "item": key,
+            **fields,
+            "status": "ok",
+            "rows": 0,
+            "bytes": 0,
+            "retries": 0,
+            "phases": {},
+            "query_ids": [],
+        }
+        previous = _record()
+        _current.record = record
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+            raise
+        finally:
+            _current.record = previous
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+            with self._lock:
+                self.records.append(record)
+                if self.path is not None:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, default=str) + "\n")
+
+    def report(self, line, file=None):
+        """Print a progress line for one finished (or skipped) item and redraw the progress bar."""
+        with self._lock:
+            self.done += 1
+            if self._bar:
+                sys.stderr.write("\r\033[K")
+                sys.stderr.flush()
+            print(line, file=file or sys.stdout, flush=True)
+            if self._bar:
+                sys.stderr.write(self._progress_bar())
+                sys.stderr.flush()
+
+    def _progress_bar(self, width=30):
+        total = max(self.total, 1)
+        filled = int(width * min(self.done, total) / total)
+        elapsed = time.perf_counter() - self.started
+        eta = ""
+        if 0 < self.done < total:
+            eta = f" ETA {_duration(elapsed / self.done * (total - self.done))}"
+        return (
+            f"[{'#' * filled}{'-' * (width - filled)}] {self.done}/{self.total} "
+            f"{100 * self.done // total}% {_duration(elapsed)}{eta}"
+        )
+
+    def summary(self, top=5):
+        """Print the slowest items, per-phase totals and overall throughput."""
+        if self._bar:
+            sys.stderr.write("\r\033[K")
+            sys.stderr.flush()
+        if not self.records:
+            return
+        elapsed = time.perf_counter() - self.started
+        rows = sum(r["rows"] for r in self.records)
+        size_mb = sum(r["bytes"] for r in self.records) / (1024 * 1024)
+        failed = sum(1 for r in self.records if r["status"] == "failed")
+        print(f"Slowest {min(top, len(self.records))} of {len(self.records)}:")
+        for record in sorted(self.records, key=lambda r: r["seconds"], reverse=True)[:top]:
+            phases = ", ".join(f"{name} {secs:.1f}s" for name, secs in record["phases"].items())
+            print(f"  {record['item']}: {record['seconds']:.1f}s, {record['rows']} rows ({phases or 'no phases'})")
+        totals = {}
+        for record in self.records:
+            for name, secs in record["phases"].items():
+                totals[name] = totals.get(name, 0.0) + secs
+        if totals:
+            print("Time by phase: " + ", ".join(f"{name} {secs:.1f}s" for name, secs in totals.items()))
+        print(
+            f"Throughput: {rows} rows, {size_mb:.1f} MB in {_duration(elapsed)} "
+            f"({rows / elapsed if elapsed else 0:,.0f} rows/s, {size_mb / elapsed if elapsed else 0:.2f} MB/s)"
+            + (f", {failed} failed" if failed else "")
+        )
+        if self.path is not None:
+            print(f"Metrics written to {self.path}")
@@ -2,7 +2,7 @@
 -- Run in Snowflake Worksheets after loading the 509 tables. Use the schema that has these tables (e.g. PUBLIC).
 -- Listed in README "Sample queries" section.
 
--- Row counts per table
+-- Row counts per table (python verify_snowflake.py checks every table's COUNT(*) and HASH_AGG(*) against the export)
 SELECT 'CUSTOMER' AS table_name, COUNT(*) AS row_count FROM CUSTOMER
 UNION ALL SELECT 'LINEITEM', COUNT(*) FROM LINEITEM
 UNION ALL SELECT 'NATION', COUNT(*) FROM NATION
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Catalog discovery: every schema, table, row count, byte size and LAST_ALTERED value of a
+database from a single INFORMATION_SCHEMA.TABLES query, instead of one SHOW TABLES per schema.
+
+Results are cached in .cache/catalog_<ACCOUNT>_<ROLE>_<DATABASE>.json for SNOWFLAKE_CATALOG_TTL
+seconds (default 600; 0 disables the cache) so list_tables.py and export dry runs skip the catalog
+walk; exports and copies refresh it.
+The account and role are part of the name because the same database name can exist in several
+accounts, and different roles see different tables.
+"""
+import json
+import re
+import time
+from pathlib import Path
+
+from snowflake_connection import int_env
+
+_script_dir = Path(__file__).resolve().parent
+CACHE_DIR = _script_dir / ".cache"
+
+
+def _catalog_ttl():
+    return int_env("SNOWFLAKE_CATALOG_TTL", 600)
+
+
+def _cache_path(conn, database):
+    """Cache file for this connection's account and role (the connector exposes both on the connection)."""
+    parts = [getattr(conn, "account", None) or "", getattr(conn, "role", None) or "", database]
+    name = "_".join(re.sub(r"[^A-Za-z0-9_.-]", "_", part) for part in parts)
+    return CACHE_DIR / f"catalog_{name}.json"
+
+
+def query_catalog(conn, database):
+    """Return [{schema, table, row_count, bytes, last_altered}, ...] for all base tables in one query."""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT TABLE_SCHEMA, TABLE_NAME, ROW_COUNT, BYTES, LAST_ALTERED "
+            f'FROM "{database}".INFORMATION_SCHEMA.TABLES '
+            "WHERE TABLE_TYPE = 'BASE TABLE' AND TABLE_SCHEMA <> 'INFORMATION_SCHEMA' "
+            "ORDER BY TABLE_SCHEMA, TABLE_NAME"
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    return [
+        {
+            "schema": schema,
+            "table": table,
+            "row_count": row_count,
+            "bytes": size,
+            "last_altered": last_altered.isoformat() if last_altered is not None else None,
+        }
+        for schema, table, row_count, size, last_altered in rows
+    ]
+
+
+def discover_catalog(conn, database, refresh=False, ttl=None):
+    """Return the catalog for database, from the local cache when it is younger than the TTL unless refresh."""
+    ttl = _catalog_ttl() if ttl is None else ttl
+    cache_path = _cache_path(conn, database)
+    if not refresh and ttl > 0 and cache_path.exists():
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached.get("database") == database and time.time() - cached.get("fetched_at", 0) < ttl:
+            return cached["tables"]
+    tables = query_catalog(conn, database)
+    if ttl > 0:
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp_path = cache_path.with_suffix(".json.tmp")
+        tmp_path.write_text(
+            json.dumps({"database": database, "fetched_at": time.time(), "tables": tables}, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        tmp_path.replace(cache_path)
+    return tables
+
+
+def tables_by_schema(catalog):
+    """Group catalog entries into {schema: [table, ...]} (both sorted)."""
+    grouped = {}
+    for entry in catalog:
+        grouped.setdefault(entry["schema"], []).append(entry["table"])
+    return {schema: sorted(tables) for schema, tables in sorted(grouped.items())}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Shared Snowflake connection layer for the export, load and task scripts.
+Reads connection settings from .env / environment only (use a PAT as SNOWFLAKE_PASSWORD).
+
+snowflake.connector is imported only when a connection is actually opened, so scripts
+start instantly for --help and argument validation. ConnectionPool hands out a small set
+of reusable connections to worker threads.
+"""
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+_script_dir = Path(__file__).resolve().parent
+load_dotenv(_script_dir / ".env")
+load_dotenv(_script_dir.parent / ".env")
+
+
+def require_env(*names):
+    """Return the values of the given env vars; exit with a message naming the first missing one."""
+    values = []
+    for name in names:
+        val = os.getenv(name)
+        if not val:
+            raise SystemExit(f"Missing required env: {name}. Set in .env.")
+        values.append(val)
+    return values
+
+
+def int_env(name, default, minimum=0):
+    """Whole-number env setting; unset, non-numeric or below minimum falls back to default."""
+    val = os.getenv(name, "").strip()
+    return int(val) if val.isdigit() and int(val) >= minimum else default
+
+
+def env_flag(name, default=False):
+    """Boolean env setting: 1/true/yes turn it on, 0/false/no turn it off, anything else keeps default."""
+    val = os.getenv(name, "").strip().lower()
+    if val in ("1", "true", "yes"):
+        return True
+    if val in ("0", "false", "no"):
+        return False
+    return default
+
+
+def bulk_ddl():
+    """Whether to fetch DDL once per schema (SNOWFLAKE_EXPORT_BULK_DDL, default on)."""
+    return env_flag("SNOWFLAKE_EXPORT_BULK_DDL", True)
+
+
+def connection_params(database=None, schema=None, prefix="SNOWFLAKE_"):
+    """Build snowflake.connector.connect() keyword arguments from the environment (prefix selects a second set)."""
+    account, user, password, warehouse, role = (
+        os.getenv(f"{prefix}{name}") or os.getenv(f"SNOWFLAKE_{name}")
+        for name in ("ACCOUNT", "USER", "PASSWORD", "WAREHOUSE", "ROLE")
+    )
+    for name, val in (("ACCOUNT", account), ("USER", user), ("PASSWORD", password), ("WAREHOUSE", warehouse)):
+        if not val:
+            raise SystemExit(f"Missing required env: {prefix}{name}. Set in .env.")
+    if ".snowflakecomputing.com" in account:
+        account = account.replace(".snowflakecomputing.com", "")
+    params = {
+        "account": account,
+        "user": user,
+        "password": password,
+        "warehouse": warehouse,
+        "role": role,
+        "login_timeout": int_env("SNOWFLAKE_LOGIN_TIMEOUT", 60),
+        # Arrow/pandas results keep NUMBER(p,s) as exact decimals, matching fetchone()/fetchmany()
+        "arrow_number_to_decimal": True,
+        "client_session_keep_alive": env_flag("SNOWFLAKE_SESSION_KEEP_ALIVE", True),
+    }
+    network_timeout = int_env("SNOWFLAKE_NETWORK_TIMEOUT", 0)
+    if network_timeout:
+        params["network_timeout"] = network_timeout
+    if database:
+        params["database"] = database
+    if schema:
+        params["schema"] = schema
+    return params
+
+
+def connect(database=None, schema=None, prefix="SNOWFLAKE_"):
+    """Open a new Snowflake connection using connection_params()."""
+    import snowflake.connector
+    return snowflake.connector.connect(**connection_params(database, schema, prefix))
+
+
+class ConnectionPool:
+    """A small thread-safe pool of Snowflake connections, opened lazily up to size."""
+
+    def __init__(self, factory, size):
+        self._factory = factory
+        self._size = max(size, 1)
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        try:
+            conn = self._factory()
+        except BaseException:
+            with self._lock:
+                self._opened -= 1
+            raise
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def acquire(self):
+        """Check out a connection, opening a new one while the pool is below its size."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self._size
+                if can_open:
+                    self._opened += 1
+            conn = self._open() if can_open else self._idle.get()
+        if conn.is_closed():
+            with self._lock:
+                self._all.remove(conn)
+            conn = self._open()
+        return conn
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Split Snowflake SQL scripts into statements and pick out table DDL and its columns.
+
+Unlike sql.split(";"), split_sql_statements ignores semicolons inside 'string literals',
+"quoted identifiers", $$dollar-quoted bodies$$, -- line comments and /* block comments */.
+"""
+import re
+
+_IDENT = r'(?:"(?:[^"]|"")+"|[A-Za-z_][\w$]*)'
+_QUALIFIED = rf"((?:{_IDENT}\s*\.\s*)*{_IDENT})"
+_CREATE_TABLE_RE = re.compile(
+    r"^create\s+(?:or\s+replace\s+)?(?:(?:local|global)\s+)?(?:temporary\s+|temp\s+|transient\s+|volatile\s+)?"
+    rf"table\s+(?:if\s+not\s+exists\s+)?{_QUALIFIED}",
+    re.IGNORECASE,
+)
+_ALTER_TABLE_RE = re.compile(rf"^alter\s+table\s+(?:if\s+exists\s+)?{_QUALIFIED}", re.IGNORECASE)
+_CREATE_TASK_RE = re.compile(
+    rf"^create\s+(?:or\s+replace\s+)?task\s+(?:if\s+not\s+exists\s+)?{_QUALIFIED}", re.IGNORECASE
+)
+_IDENT_RE = re.compile(_IDENT)
+_QUOTED_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"]|\"\")*\"")
+_COLUMN_TYPE_RE = re.compile(r"\s*([A-Za-z_]\w*(?:\s*\([^)]*\))?)")
+_TABLE_CONSTRAINT_RE = re.compile(r"^(?:constraint|primary|unique|foreign)\b", re.IGNORECASE)
+# Characters where quoting, comments or statement boundaries can start
+_SPECIAL_RE = re.compile(r"""['";]|\$\$|--|//|/\*""")
+
+
+def split_sql_statements(sql):
+    """Return the non-empty statements in sql, without their trailing semicolons."""
+    statements = []
+    start = 0
+    n = len(sql)
+    match = _SPECIAL_RE.search(sql)
+    while match:
+        i = match.start()
+        ch = sql[i]
+        if ch == "'":
+            i += 1
+            while i < n:
+                if sql[i] == "\\":
+                    i += 2
+                    continue
+                if sql[i] == "'":
+                    if i + 1 < n and sql[i + 1] == "'":
+                        i += 2
+                        continue
+                    break
+                i += 1
+        elif ch == '"':
+            end = sql.find('"', i + 1)
+            while end != -1 and end + 1 < n and sql[end + 1] == '"':
+                end = sql.find('"', end + 2)
+            i = n if end == -1 else end
+        elif sql.startswith("$$", i):
+            end = sql.find("$$", i + 2)
+            i = n if end == -1 else end + 1
+        elif sql.startswith("--", i) or sql.startswith("//", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end == -1 else end + 1
+        elif ch == ";":
+            statements.append(sql[start:i])
+            start = i + 1
+        match = _SPECIAL_RE.search(sql, i + 1)
+    statements.append(sql[start:])
+    return [stmt.strip() for stmt in statements if strip_comments(stmt).strip()]
+
+
+def strip_comments(stmt):
+    """Remove leading -- / // line comments and /* */ block comments from a statement."""
+    stmt = stmt.lstrip()
+    while True:
+        if stmt.startswith("--") or stmt.startswith("//"):
+            end = stmt.find("\n")
+            stmt = "" if end == -1 else stmt[end + 1:].lstrip()
+        elif stmt.startswith("/*"):
+            end = stmt.find("*/")
+            stmt = "" if end == -1 else stmt[end + 2:].lstrip()
+        else:
+            return stmt
+
+
+def object_name(qualified):
+    """Last part of a possibly qualified identifier, unquoted ("a""b" -> a"b) or uppercased."""
+    name = _IDENT_RE.findall(qualified)[-1]
+    if name.startswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name.upper()
+
+
+def table_statement_name(stmt):
+    """Return (kind, table) for CREATE TABLE / ALTER TABLE statements, else None."""
+    body = strip_comments(stmt)
+    match = _CREATE_TABLE_RE.match(body)
+    if match:
+        return "create", object_name(match.group(1))
+    match = _ALTER_TABLE_RE.match(body)
+    if match:
+        return "alter", object_name(match.group(1))
+    return None
+
+
+def _mask_quoted(stmt):
+    """stmt with quoted strings and identifiers replaced by x's of the same length."""
+    return _QUOTED_RE.sub(lambda m: "x" * len(m.group(0)), stmt)
+
+
+def table_columns(stmt):
+    """Return [(column, type), ...] from a CREATE TABLE statement's column list, else []."""
+    body = strip_comments(stmt)
+    match = _CREATE_TABLE_RE.match(body)
+    if not match:
+        return []
+    masked = _mask_quoted(body)
+    start = masked.find("(", match.end())
+    if start == -1:
+        return []
+    columns = []
+    depth = 0
+    item_start = start + 1
+    for i in range(start, len(masked)):
+        ch = masked[i]
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if (ch == "," and depth == 1) or depth == 0:
+            item = body[item_start:i].strip()
+            name = _IDENT_RE.match(item)
+            if name and not _TABLE_CONSTRAINT_RE.match(item):
+                sf_type = _COLUMN_TYPE_RE.match(item, name.end())
+                if sf_type:
+                    columns.append((object_name(name.group(0)), sf_type.group(1)))
+            item_start = i + 1
+        if depth == 0:
+            break
+    return columns
+
+
+def task_statement_name(stmt):
+    """Return the task name for a CREATE TASK statement, else None."""
+    match = _CREATE_TASK_RE.match(strip_comments(stmt))
+    return object_name(match.group(1)) if match else None
+
+
+def task_statement_header_end(stmt):
+    """Index of the AS keyword that starts a CREATE TASK statement's body (outside quotes), or -1."""
+    masked = _mask_quoted(stmt)
+    match = re.search(r"\sas\s", masked, re.IGNORECASE)
+    return match.start() + 1 if match else -1
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Row filters for a deterministic, referentially consistent subset export.
+
+The root table keeps rows whose key hashes (with a seed) into the first N% of buckets.
+Tables that reference kept rows follow it (children, e.g. LINEITEM of kept ORDERS), tables
+referenced by kept rows are pulled in (parents, e.g. CUSTOMER -> NATION -> REGION), and
+tables whose every parent is in the subset keep only rows pointing at kept parents
+(e.g. PARTSUPP). Each filter is a WHERE predicate of IN (SELECT ...) semi-joins, so the
+warehouse does the work and the same settings always give the same rows.
+"""
+
+# TPC-H foreign keys as CHILD.COLUMN=PARENT.COLUMN (composite keys as single-column edges)
+DEFAULT_RELATIONSHIPS = (
+    "LINEITEM.L_ORDERKEY=ORDERS.O_ORDERKEY;"
+    "LINEITEM.L_PARTKEY=PART.P_PARTKEY;"
+    "LINEITEM.L_SUPPKEY=SUPPLIER.S_SUPPKEY;"
+    "ORDERS.O_CUSTKEY=CUSTOMER.C_CUSTKEY;"
+    "PARTSUPP.PS_PARTKEY=PART.P_PARTKEY;"
+    "PARTSUPP.PS_SUPPKEY=SUPPLIER.S_SUPPKEY;"
+    "CUSTOMER.C_NATIONKEY=NATION.N_NATIONKEY;"
+    "SUPPLIER.S_NATIONKEY=NATION.N_NATIONKEY;"
+    "NATION.N_REGIONKEY=REGION.R_REGIONKEY"
+)
+
+# Hash buckets; percentages are kept to 1/10000 of a percent
+_BUCKETS = 1000000
+
+
+def parse_relationships(spec):
+    """Parse "CHILD.COL=PARENT.COL;..." into [(child, child_col, parent, parent_col), ...] (uppercased)."""
+    relationships = []
+    for part in spec.replace("\n", ";").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            child, parent = (side.strip().upper() for side in part.split("="))
+            child_table, child_col = child.rsplit(".", 1)
+            parent_table, parent_col = parent.rsplit(".", 1)
+        except ValueError:
+            raise SystemExit(f"Invalid subset relationship: {part!r} (use CHILD.COLUMN=PARENT.COLUMN).")
+        relationships.append((child_table, child_col, parent_table, parent_col))
+    return relationships
+
+
+def root_key(root, relationships):
+    """Column of the root table to hash: the key its children reference, else its first foreign key."""
+    for _, _, parent, parent_col in relationships:
+        if parent == root:
+            return parent_col
+    for child, child_col, _, _ in relationships:
+        if child == root:
+            return child_col
+    raise SystemExit(f"Subset root {root} has no relationships; set SNOWFLAKE_EXPORT_SUBSET_KEY.")
+
+
+def subset_filters(database, schema, tables, root, percent, seed=0, relationships=None, key=None):
+    """Return {table: WHERE predicate} for the subset rooted at root in database.schema."""
+    relationships = [
+        rel for rel in (relationships if relationships is not None else parse_relationships(DEFAULT_RELATIONSHIPS))
+        if rel[0] in tables and rel[2] in tables
+    ]
+    if root not in tables:
+        return {}
+
+    def _name(table):
+        return f'"{database}"."{schema}"."{table}"'
+
+    threshold = int(round(float(percent) * _BUCKETS / 100))
+    filters = {root: f"MOD(ABS(HASH({key or root_key(root, relationships)}, {int(seed)})), {_BUCKETS}) < {threshold}"}
+
+    def _semi_join(col, source, source_col):
+        return f"{col} IN (SELECT {source_col} FROM {_name(source)} WHERE {filters[source]})"
+
+    # Children: rows referencing kept rows, followed down from the root
+    down = [root]
+    for table in down:
+        for child, child_col, parent, parent_col in relationships:
+            if parent == table and child not in filters:
+                edges = [r for r in relationships if r[0] == child and r[2] in down]
+                filters[child] = " AND ".join(_semi_join(c, p, pc) for _, c, p, pc in edges)
+                down.append(child)
+
+    # Parents: rows referenced by any included table. Find every table pulled in upwards first,
+    # so a parent shared by several referencers (NATION by CUSTOMER and SUPPLIER) sees them all
+    included = set(filters)
+    while True:
+        parents = {p for c, _, p, _ in relationships if c in included} - included
+        if not parents:
+            break
+        included |= parents
+    resolving = set()
+
+    def _resolve(table):
+        if table in filters or table in resolving:
+            return
+        resolving.add(table)
+        referencers = [r for r in relationships if r[2] == table and r[0] in included]
+        for child, _, _, _ in referencers:
+            _resolve(child)
+        predicates = [_semi_join(pc, c, cc) for c, cc, _, pc in referencers if c in filters]
+        if predicates:
+            filters[table] = " OR ".join(predicates)
+
+    for table in sorted(included):
+        _resolve(table)
+
+    # Fill-ins: tables whose every parent is in the subset keep rows pointing at kept parents
+    for table in sorted({r[0] for r in relationships} - set(filters)):
+        edges = [r for r in relationships if r[0] == table]
+        if all(p in filters for _, _, p, _ in edges):
+            filters[table] = " AND ".join(_semi_join(c, p, pc) for _, c, p, pc in edges)
+    return filters
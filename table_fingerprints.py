@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+COUNT(*) / HASH_AGG(*) fingerprints of many tables, computed server-side in a few queries.
+
+Tables are grouped into UNION ALL queries of SNOWFLAKE_VERIFY_BATCH_TABLES tables (default 100)
+that run concurrently on one connection (SNOWFLAKE_VERIFY_CONCURRENCY, default 4), so
+fingerprinting a whole database takes a handful of round trips and downloads one row per
+table. HASH_AGG(*) ignores row order, so two tables holding the same rows (with the same
+column types and order) get the same fingerprint.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from snowflake_connection import int_env
+
+
+def table_sql(database, schema, table_name):
+    """SELECT of a whole table, to fingerprint as is."""
+    return f'SELECT * FROM "{database}"."{schema}"."{table_name}"'
+
+
+def _fingerprint_batch(conn, keys, queries):
+    sql = "\nUNION ALL\n".join(
+        f"SELECT {i} AS N, COUNT(*) AS ROW_COUNT, HASH_AGG(*) AS HASH_AGG FROM ({queries[key]})"
+        for i, key in enumerate(keys)
+    )
+    cur = conn.cursor()
+    try:
+        cur.execute(sql)
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    return {keys[n]: (int(count), int(hash_agg)) for n, count, hash_agg in rows}
+
+
+def fingerprint_tables(conn, queries):
+    """Fingerprint {key: SELECT statement}; returns {key: (row_count, hash_agg), or None if its query failed}."""
+    import snowflake.connector.errors
+    keys = list(queries)
+    batch_size = int_env("SNOWFLAKE_VERIFY_BATCH_TABLES", 100, minimum=1)
+    batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+
+    def _run(batch):
+        try:
+            return _fingerprint_batch(conn, batch, queries)
+        except snowflake.connector.errors.ProgrammingError:
+            if len(batch) == 1:
+                return {batch[0]: None}
+        results = {}
+        for key in batch:
+            try:
+                results.update(_fingerprint_batch(conn, [key], queries))
+            except snowflake.connector.errors.ProgrammingError:
+                results[key] = None
+        return results
+
+    fingerprints = {}
+    if not batches:
+        return fingerprints
+    with ThreadPoolExecutor(max_workers=min(int_env("SNOWFLAKE_VERIFY_CONCURRENCY", 4, minimum=1), len(batches))) as executor:
+        for results in executor.map(_run, batches):
+            fingerprints.update(results)
+    return fingerprints
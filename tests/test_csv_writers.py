@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+The Arrow CSV writer must produce the same bytes as the default python writer.
+
+Runs against bench/fake_snowflake.py, whose fetchmany() values are built like the
+connector's (TIMESTAMP_TZ/LTZ offsets, nanoseconds truncated, BINARY as bytearray).
+Run: python -m pytest tests (or python -m unittest discover tests)
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+_repo_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_repo_dir))
+sys.path.insert(0, str(_repo_dir / "bench"))
+
+import fake_snowflake  # noqa: E402
+
+fake_snowflake.install()
+
+import export_snowflake_to_csv as export  # noqa: E402
+
+
+class CsvWritersTest(unittest.TestCase):
+    def setUp(self):
+        self._saved = (os.environ.get("SNOWFLAKE_EXPORT_CSV_WRITER"), dict(fake_snowflake.SETTINGS))
+        # Several result chunks per table, so batch boundaries are covered too
+        fake_snowflake.SETTINGS.update(latency=0.0, chunk_rows=700)
+        self._tmp = tempfile.TemporaryDirectory()
+        self.out_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        writer, settings = self._saved
+        if writer is None:
+            os.environ.pop("SNOWFLAKE_EXPORT_CSV_WRITER", None)
+        else:
+            os.environ["SNOWFLAKE_EXPORT_CSV_WRITER"] = writer
+        fake_snowflake.SETTINGS.update(settings)
+        self._tmp.cleanup()
+
+    def _export_both(self, table):
+        conn = fake_snowflake.FakeConnection({"T": table})
+        outputs = {}
+        for writer in ("python", "arrow"):
+            os.environ["SNOWFLAKE_EXPORT_CSV_WRITER"] = writer
+            out_path = self.out_dir / f"{writer}.csv"
+            rows = export.export_table_to_csv(conn, "DB", "S", "T", out_path)
+            self.assertEqual(rows, table.rows)
+            outputs[writer] = out_path.read_bytes()
+        return outputs
+
+    def test_same_bytes_for_common_types(self):
+        outputs = self._export_both(fake_snowflake.FakeTable(2000, 14))
+        self.assertEqual(outputs["arrow"], outputs["python"])
+
+    def test_same_bytes_for_tz_nanosecond_time_and_binary(self):
+        kinds = fake_snowflake.COLUMN_KINDS + fake_snowflake.EDGE_COLUMN_KINDS
+        outputs = self._export_both(fake_snowflake.FakeTable(2000, len(kinds), kinds=kinds))
+        self.assertEqual(outputs["arrow"], outputs["python"])
+
+    def test_naive_nanosecond_timestamps_keep_microseconds(self):
+        kinds = [("LOADED_AT", "TIMESTAMP_NTZ(9)"), ("START_TIME", "TIME")]
+        outputs = self._export_both(fake_snowflake.FakeTable(50, 2, null_ratio=0.0, kinds=kinds))
+        first_row = outputs["arrow"].decode("utf-8").splitlines()[1]
+        # str(datetime) / str(time): at most 6 fractional digits
+        for value in first_row.split(","):
+            self.assertRegex(value, r"^[^.]*(\.\d{1,6})?$")
+        self.assertEqual(outputs["arrow"], outputs["python"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Verify loaded tables server-side with COUNT(*) and HASH_AGG(*), without downloading any data.
+
+By default the target (SNOWFLAKE_DATABASE) is compared with the fingerprints the export recorded
+in data/manifest.json. With --source, the source database (SNOWFLAKE_SOURCE_DATABASE and the
+SNOWFLAKE_SOURCE_* connection, as for copy_snowflake_to_snowflake.py) is fingerprinted at the
+same time as the target instead. Both sides use batched queries (table_fingerprints), so every
+table is checked in a few round trips. Exits 1 if any table differs or is missing.
+
+Run: python verify_snowflake.py [--source] [--schema NAME ...]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from snowflake_catalog import discover_catalog, tables_by_schema
+from snowflake_connection import connect, require_env
+from table_fingerprints import fingerprint_tables, table_sql
+
+_script_dir = Path(__file__).resolve().parent
+SOURCE_PREFIX = "SNOWFLAKE_SOURCE_"
+
+
+def manifest_fingerprints(manifest_path, default_schema):
+    """Read the export manifest; returns ({(schema, table): (rows, hash_agg)}, {(schema, table): target schema}, skipped)."""
+    if not manifest_path.exists():
+        raise SystemExit(f"No {manifest_path.name} in data/. Run the export first, or use --source.")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    expected = {}
+    target_schemas = {}
+    skipped = 0
+    for key, entry in manifest["tables"].items():
+        schema, table_name = key.split(".", 1)
+        fingerprint = entry.get("fingerprint")
+        if fingerprint is None:
+            skipped += 1
+            continue
+        expected[(schema, table_name)] = (fingerprint["rows"], fingerprint["hash_agg"])
+        target_schemas[(schema, table_name)] = schema if "/" in entry["file"] else default_schema
+    return expected, target_schemas, skipped
+
+
+def compare(expected, actual):
+    """Return [(label, problem), ...] for tables whose fingerprints are missing or differ."""
+    problems = []
+    for key in sorted(expected):
+        label = ".".join(key)
+        want, got = expected[key], actual.get(key)
+        if want is None:
+            problems.append((label, "could not be fingerprinted on the source"))
+        elif got is None:
+            problems.append((label, "missing on the target (or its query failed)"))
+        elif want[0] != got[0]:
+            problems.append((label, f"rows {want[0]} expected, {got[0]} found"))
+        elif want[1] != got[1]:
+            problems.append((label, f"same row count ({got[0]}) but HASH_AGG differs"))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare COUNT(*) and HASH_AGG(*) of loaded tables with their source.")
+    parser.add_argument(
+        "--source", action="store_true",
+        help="Fingerprint SNOWFLAKE_SOURCE_DATABASE live instead of reading data/manifest.json.",
+    )
+    parser.add_argument(
+        "--schema", action="append", dest="schemas", metavar="NAME",
+        help="Verify only this schema (repeat for several; default: all).",
+    )
+    args = parser.parse_args()
+
+    (target_database,) = require_env("SNOWFLAKE_DATABASE")
+    start = time.perf_counter()
+    target_conn = connect(target_database)
+    try:
+        if args.source:
+            (source_database,) = require_env("SNOWFLAKE_SOURCE_DATABASE")
+            source_conn = connect(source_database, prefix=SOURCE_PREFIX)
+            try:
+                schema_tables = tables_by_schema(discover_catalog(source_conn, source_database, refresh=True))
+                keys = [
+                    (schema, name) for schema, names in schema_tables.items()
+                    if not args.schemas or schema in args.schemas for name in names
+                ]
+                # Both sides at once: the source and target queries run on different warehouses/accounts
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    source_future = executor.submit(
+                        fingerprint_tables, source_conn, {key: table_sql(source_database, *key) for key in keys}
+                    )
+                    target_future = executor.submit(
+                        fingerprint_tables, target_conn, {key: table_sql(target_database, *key) for key in keys}
+                    )
+                    expected, actual = source_future.result(), target_future.result()
+            finally:
+                source_conn.close()
+            skipped = 0
+        else:
+            expected, target_schemas, skipped = manifest_fingerprints(
+                _script_dir / "data" / "manifest.json", os.getenv("SNOWFLAKE_SCHEMA")
+            )
+            if args.schemas:
+                expected = {key: value for key, value in expected.items() if key[0] in args.schemas}
+            actual = fingerprint_tables(
+                target_conn,
+                {key: table_sql(target_database, target_schemas[key], key[1]) for key in expected},
+            )
+    finally:
+        target_conn.close()
+
+    problems = compare(expected, actual)
+    for label, problem in problems:
+        print(f"  {label}: {problem}")
+    print(
+        f"Verified {len(expected)} tables in {time.perf_counter() - start:.1f}s: "
+        f"{len(expected) - len(problems)} match, {len(problems)} differ or missing"
+        + (f", {skipped} without a recorded fingerprint (skipped)" if skipped else "")
+    )
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()